@@ -1,13 +1,22 @@
 import logging
-from typing import Final
+from collections.abc import Callable, Iterable
+from functools import partial
+from typing import TYPE_CHECKING, Any, Final
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import (
+    async_dispatcher_connect,
+    async_dispatcher_send,
+)
 
-from . import _preload_proto  # noqa: F401 # pyright: ignore[reportUnusedImport]
 from .device_data import DeviceData, DeviceOptions
 
+if TYPE_CHECKING:
+    from .api import EcoflowApiClient
+    from .devices import BaseDevice
+
 _LOGGER = logging.getLogger(__name__)
 
 ECOFLOW_DOMAIN = "ecoflow_cloud"
@@ -27,8 +36,15 @@ ATTR_STATUS_LAST_UPDATE = "status_last_update"
 ATTR_STATUS_DATA_LAST_UPDATE = "data_last_update"
 ATTR_MQTT_CONNECTED = "mqtt_connected"
 ATTR_STATUS_RECONNECTS = "reconnects"
+ATTR_STATUS_RECONNECT_STORMS = "reconnect_storms"
 ATTR_STATUS_PHASE = "status_phase"
 ATTR_QUOTA_REQUESTS = "quota_requests"
+ATTR_COMMANDS_SENT = "commands_sent"
+ATTR_COMMANDS_REPLIED = "commands_replied"
+ATTR_COMMANDS_LOST = "commands_lost"
+ATTR_COMMANDS_PENDING = "commands_pending"
+ATTR_COMMAND_RTT_AVG = "rtt_avg_ms"
+ATTR_COMMAND_RTT_MAX = "rtt_max_ms"
 
 CONF_AUTH_TYPE: Final = "auth_type"
 
@@ -51,6 +67,8 @@ CONF_PARENT_SN: Final = "parent_sn"
 OPTS_DIAGNOSTIC_MODE: Final = "diagnostic_mode"
 OPTS_POWER_STEP: Final = "power_step"
 OPTS_REFRESH_PERIOD_SEC: Final = "refresh_period_sec"
+OPTS_PROCESS_DECODE: Final = "process_decode"
+OPTS_COALESCE_WINDOW_MS: Final = "coalesce_window_ms"
 
 DEFAULT_REFRESH_PERIOD_SEC: Final = 5
 
@@ -145,6 +163,8 @@ def extract_devices(entry: ConfigEntry) -> dict[str, DeviceData]:
                 entry.options[CONF_DEVICE_LIST][sn][OPTS_REFRESH_PERIOD_SEC],
                 entry.options[CONF_DEVICE_LIST][sn][OPTS_POWER_STEP],
                 entry.options[CONF_DEVICE_LIST][sn][OPTS_DIAGNOSTIC_MODE],
+                entry.options[CONF_DEVICE_LIST][sn].get(OPTS_PROCESS_DECODE, False),
+                entry.options[CONF_DEVICE_LIST][sn].get(OPTS_COALESCE_WINDOW_MS, 0),
             ),
             None,
             None,
@@ -191,6 +211,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
 
     await api_client.login()
 
+    from .devices import load_device_modules
+
+    await hass.async_add_executor_job(
+        load_device_modules, _device_types(devices_list.values())
+    )
+
     for sn, device_data in devices_list.items():
         device = api_client.configure_device(device_data)
         device.configure(hass)
@@ -198,14 +224,39 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     await hass.async_add_executor_job(api_client.start)
     hass.data[ECOFLOW_DOMAIN][entry.entry_id] = api_client
     await hass.config_entries.async_forward_entry_setups(entry, _PLATFORMS)
+    # entities registered the keys they read, decode only those from now on
+    for device in api_client.devices.values():
+        device.projection.activate()
 
     await api_client.quota_all(None)
 
-    entry.async_on_unload(entry.add_update_listener(update_listener))
+    entry.async_on_unload(
+        entry.add_update_listener(
+            partial(update_listener, connection_data=_connection_data(entry))
+        )
+    )
 
     return True
 
 
+def device_added_signal(entry: ConfigEntry) -> str:
+    return f"{ECOFLOW_DOMAIN}_{entry.entry_id}_device_added"
+
+
+def async_track_devices(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    add_device: Callable[["BaseDevice"], None],
+):
+    """Call add_device for every device of the entry, also for devices added later."""
+    client: EcoflowApiClient = hass.data[ECOFLOW_DOMAIN][entry.entry_id]
+    for device in client.devices.values():
+        add_device(device)
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, device_added_signal(entry), add_device)
+    )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     if not await hass.config_entries.async_unload_platforms(entry, _PLATFORMS):
         return False
@@ -215,5 +266,86 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     return True
 
 
-async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+async def update_listener(
+    hass: HomeAssistant, entry: ConfigEntry, connection_data: dict[str, Any]
+) -> None:
+    if _connection_data(entry) == connection_data and await _async_update_devices(
+        hass, entry
+    ):
+        return
     await hass.config_entries.async_reload(entry.entry_id)
+
+
+def _device_types(devices: Iterable[DeviceData]) -> set[str]:
+    # sub devices are handled by the device class of their parent
+    return {
+        device_type
+        for device_data in devices
+        for device_type in (
+            device_data.device_type,
+            device_data.parent.device_type if device_data.parent else None,
+        )
+        if device_type is not None
+    }
+
+
+def _connection_data(entry: ConfigEntry) -> dict[str, Any]:
+    return {k: v for k, v in entry.data.items() if k != CONF_DEVICE_LIST}
+
+
+def _device_changed(new: DeviceData, current: DeviceData) -> bool:
+    # device classes may adjust their DeviceData (e.g. the PowerKit display name),
+    # only compare what the device is built from
+    return (
+        new.device_type != current.device_type
+        or new.options != current.options
+        or (new.parent and new.parent.sn) != (current.parent and current.parent.sn)
+    )
+
+
+async def _async_update_devices(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Add and remove devices of a running entry, returns False if it needs a reload.
+
+    The MQTT connection and the other devices (and their entities) are kept, only
+    the topics of the added or removed devices are (un)subscribed.
+    """
+    client: EcoflowApiClient = hass.data[ECOFLOW_DOMAIN][entry.entry_id]
+    devices = extract_devices(entry)
+    current = {sn: device.device_data for sn, device in client.devices.items()}
+    if any(
+        _device_changed(devices[sn], current[sn])
+        for sn in devices.keys() & current.keys()
+    ):
+        # options of a configured device changed
+        return False
+
+    removed = [client.devices[sn] for sn in current.keys() - devices.keys()]
+    # parents first, sub devices use the topics of their parent
+    added = sorted(
+        (devices[sn] for sn in devices.keys() - current.keys()),
+        key=lambda d: d.parent is not None,
+    )
+    if not removed and not added:
+        return True
+
+    for device in removed:
+        # entities were removed together with the registry device (config flow)
+        _LOGGER.info("Removing device %s", device.device_data.sn)
+        client.remove_device(device)
+
+    from .devices import load_device_modules
+
+    await hass.async_add_executor_job(load_device_modules, _device_types(added))
+    new_devices: list[BaseDevice] = []
+    for device_data in added:
+        _LOGGER.info("Adding device %s", device_data.sn)
+        device = client.configure_device(device_data)
+        device.configure(hass)
+        new_devices.append(device)
+
+    await hass.async_add_executor_job(client.refresh_subscriptions)
+    for device in new_devices:
+        async_dispatcher_send(hass, device_added_signal(entry), device)
+    for device in new_devices:
+        await client.quota_all(device.device_data.sn)
+    return True
@@ -1,12 +1,15 @@
 import logging
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from typing import Any
 
 from aiohttp import ClientResponse
 from attr import dataclass
+from paho.mqtt.client import PayloadType
 
 from ..device_data import DeviceData
 from .message import JSONMessage, Message
+from .router import EcoflowTopicRouter
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,7 +31,10 @@ class EcoflowApiClient(ABC):
     def __init__(self):
         self.mqtt_info: EcoflowMqttInfo
         self.devices: dict[str, Any] = {}
+        self.topic_router = EcoflowTopicRouter()
+        self.ingest = None
         self.mqtt_client = None
+        self.commands = None
 
     @abstractmethod
     async def login(self):
@@ -47,10 +53,15 @@ class EcoflowApiClient(ABC):
         pass
 
     def add_device(self, device):
+        previous = self.devices.get(device.device_data.sn)
+        if previous is not None:
+            self.topic_router.remove_device(previous)
         self.devices[device.device_data.sn] = device
+        self.topic_router.add_device(device)
 
     def remove_device(self, device):
         self.devices.pop(device.device_data.sn, None)
+        self.topic_router.remove_device(device)
 
     def _accept_mqqt_certification(self, resp_json: dict):
         _LOGGER.info(f"Received MQTT credentials: {resp_json}")
@@ -101,15 +112,47 @@ class EcoflowApiClient(ABC):
             command = JSONMessage(command)
 
         self.devices[device_sn].data.update_to_target_state(mqtt_state)
-        self.mqtt_client.publish(
-            self.devices[device_sn].device_info.set_topic, command.to_mqtt_payload()
+        self._queue_set_message(
+            device_sn, mqtt_state, command, command.to_mqtt_payload
         )
 
+    def _queue_set_message(
+        self,
+        device_sn: str,
+        mqtt_state: dict[str, Any],
+        command: Message,
+        payload: Callable[[], PayloadType],
+    ):
+        device = self.devices[device_sn]
+        key = ",".join(sorted(mqtt_state))
+
+        def build_payload() -> PayloadType:
+            # built right before publishing, the round trip starts here
+            data = payload()
+            device.command_tracker.sent_command(command.command_id, key)
+            return data
+
+        # a newer command for the same keys replaces a pending one
+        self.commands.submit(device_sn, key, device.device_info.set_topic, build_payload)
+
     def start(self):
         from custom_components.ecoflow_cloud.api.ecoflow_mqtt import EcoflowMQTTClient
 
-        self.mqtt_client = EcoflowMQTTClient(self.mqtt_info, self.devices)
+        from custom_components.ecoflow_cloud.api.commands import EcoflowCommandQueue
+        from custom_components.ecoflow_cloud.api.ingest import EcoflowIngestQueue
+
+        self.ingest = EcoflowIngestQueue(self.topic_router)
+        self.mqtt_client = EcoflowMQTTClient.acquire(
+            self.mqtt_info, self.topic_router, self.ingest
+        )
+        self.commands = EcoflowCommandQueue(self.mqtt_client.publish)
+
+    def refresh_subscriptions(self):
+        if self.mqtt_client is not None:
+            self.mqtt_client.refresh_subscriptions()
 
     def stop(self):
         assert self.mqtt_client is not None
-        self.mqtt_client.stop()
+        self.commands.stop()
+        self.mqtt_client.release(self.topic_router)
+        self.ingest.stop()
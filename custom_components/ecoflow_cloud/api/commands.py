@@ -0,0 +1,283 @@
+import bisect
+import itertools
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from paho.mqtt.client import PayloadType
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_COALESCE_WINDOW = 0.25
+DEFAULT_MAX_IN_FLIGHT = 2
+DEFAULT_IN_FLIGHT_TIMEOUT = 10.0
+
+type _Publish = Callable[[str, PayloadType, Callable[[], None]], None]
+type _Command = tuple[str, Callable[[], PayloadType]]
+
+
+class EcoflowCommandQueue:
+    """Outbound set commands of all devices of a client.
+
+    Commands are held back for a short window. A command for a (device, key) that
+    is still pending replaces the previous one (last write wins), so dragging a
+    slider publishes the final value instead of every step. At most
+    ``max_in_flight`` commands per device wait for their PUBACK, the others stay
+    pending until a slot is free (or the in-flight command timed out).
+    """
+
+    def __init__(
+        self,
+        publish: _Publish,
+        window: float = DEFAULT_COALESCE_WINDOW,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        in_flight_timeout: float = DEFAULT_IN_FLIGHT_TIMEOUT,
+    ) -> None:
+        self.__publish = publish
+        self.__window = window
+        self.__max_in_flight = max_in_flight
+        self.__in_flight_timeout = in_flight_timeout
+
+        self.__lock = threading.Lock()
+        self.__tokens = itertools.count()
+        self.__pending: dict[str, dict[str, _Command]] = {}
+        # device -> token -> deadline of the in-flight commands
+        self.__in_flight: dict[str, dict[int, float]] = {}
+        self.__timers: dict[str, threading.Timer] = {}
+        # devices with pending commands that wait for a free in-flight slot
+        self.__waiting = set[str]()
+        self.__stopped = False
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.published = 0
+        self.acked = 0
+        self.timed_out = 0
+        self.coalesced_by_device = dict[str, int]()
+
+    def submit(
+        self,
+        device_sn: str,
+        key: str,
+        topic: str,
+        payload: Callable[[], PayloadType],
+    ):
+        """Queue a command, the payload is built when it is published."""
+        with self.__lock:
+            if self.__stopped:
+                return
+            self.submitted += 1
+            pending = self.__pending.setdefault(device_sn, {})
+            if not key:
+                # nothing to coalesce on, never replace another command
+                key = f"#{next(self.__tokens)}"
+            elif key in pending:
+                self.coalesced += 1
+                self.coalesced_by_device[device_sn] = (
+                    self.coalesced_by_device.get(device_sn, 0) + 1
+                )
+            pending[key] = (topic, payload)
+            if device_sn not in self.__timers:
+                self.__schedule(device_sn, self.__window)
+
+    def stats(self) -> dict[str, Any]:
+        with self.__lock:
+            return {
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "published": self.published,
+                "acked": self.acked,
+                "timed_out": self.timed_out,
+                "coalesced_by_device": dict(self.coalesced_by_device),
+                "pending_by_device": {k: len(v) for k, v in self.__pending.items()},
+                "in_flight_by_device": {
+                    k: len(v) for k, v in self.__in_flight.items() if v
+                },
+            }
+
+    def stop(self):
+        with self.__lock:
+            self.__stopped = True
+            for timer in self.__timers.values():
+                timer.cancel()
+            self.__timers.clear()
+            self.__waiting.clear()
+            self.__pending.clear()
+
+    def __schedule(self, device_sn: str, delay: float):
+        timer = threading.Timer(delay, self.__flush, (device_sn,))
+        timer.daemon = True
+        self.__timers[device_sn] = timer
+        timer.start()
+
+    def __flush(self, device_sn: str):
+        now = time.monotonic()
+        batch = list[tuple[int, _Command]]()
+        with self.__lock:
+            self.__timers.pop(device_sn, None)
+            self.__waiting.discard(device_sn)
+            if self.__stopped:
+                return
+            in_flight = self.__in_flight.setdefault(device_sn, {})
+            for token, deadline in list(in_flight.items()):
+                if deadline <= now:
+                    # PUBACK lost (or arrived before it was awaited)
+                    del in_flight[token]
+                    self.timed_out += 1
+
+            pending = self.__pending.get(device_sn, {})
+            while pending and len(in_flight) < self.__max_in_flight:
+                command = pending.pop(next(iter(pending)))
+                token = next(self.__tokens)
+                in_flight[token] = now + self.__in_flight_timeout
+                batch.append((token, command))
+            self.published += len(batch)
+
+            if pending:
+                # a PUBACK flushes earlier, the timeout is the fallback
+                self.__waiting.add(device_sn)
+                self.__schedule(device_sn, min(in_flight.values()) - now)
+            else:
+                self.__pending.pop(device_sn, None)
+
+        for token, (topic, payload) in batch:
+            try:
+                self.__publish(
+                    topic, payload(), lambda t=token: self.__ack(device_sn, t)
+                )
+            except Exception as error:
+                _LOGGER.error("Error sending command to %s: %s", device_sn, error)
+                self.__ack(device_sn, token)
+
+    def __ack(self, device_sn: str, token: int):
+        with self.__lock:
+            if self.__in_flight.get(device_sn, {}).pop(token, None) is None:
+                return
+            self.acked += 1
+            if self.__stopped or device_sn not in self.__waiting:
+                return
+            self.__waiting.discard(device_sn)
+            timer = self.__timers.pop(device_sn, None)
+            if timer is not None:
+                timer.cancel()
+            self.__schedule(device_sn, 0)
+
+
+DEFAULT_REPLY_TIMEOUT = 30.0
+RTT_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class _RttHistogram:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        # the last bucket counts everything above the largest bound
+        self.buckets = [0] * (len(RTT_BUCKETS_MS) + 1)
+
+    def add(self, rtt_ms: float):
+        self.count += 1
+        self.total_ms += rtt_ms
+        self.max_ms = max(self.max_ms, rtt_ms)
+        self.buckets[bisect.bisect_left(RTT_BUCKETS_MS, rtt_ms)] += 1
+
+    def merge(self, other: "_RttHistogram"):
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+    def as_dict(self) -> dict[str, Any]:
+        bounds = [f"<={b}ms" for b in RTT_BUCKETS_MS] + [f">{RTT_BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 1) if self.count else None,
+            "max_ms": round(self.max_ms, 1),
+            "buckets": dict(zip(bounds, self.buckets)),
+        }
+
+
+class EcoflowCommandTracker:
+    """Correlates the set commands of a device with their replies.
+
+    Commands are registered by the id (JSON) or seq (protobuf) stamped into their
+    payload. A set_reply carrying the same id/seq completes the command and its
+    round-trip time is recorded per command (the state keys it sets). Commands
+    without a reply within ``timeout`` seconds are counted as lost.
+    """
+
+    def __init__(self, timeout: float = DEFAULT_REPLY_TIMEOUT) -> None:
+        self.__timeout = timeout
+        self.__lock = threading.Lock()
+        # id/seq -> (command name, send time)
+        self.__pending: dict[str, tuple[str, float]] = {}
+        self.__histograms: dict[str, _RttHistogram] = {}
+
+        self.sent = 0
+        self.replied = 0
+        self.lost = 0
+        self.unmatched = 0
+        self.last_rtt_ms: float | None = None
+
+    def sent_command(self, command_id: str | None, name: str):
+        if command_id is None:
+            return
+        now = time.monotonic()
+        with self.__lock:
+            self.__expire(now)
+            self.sent += 1
+            self.__pending[command_id] = (name or "command", now)
+
+    def reply_received(self, raw: dict[str, Any]):
+        if not isinstance(raw, dict):
+            return
+        command_id = raw.get("id", raw.get("seq"))
+        if command_id is None:
+            return
+        now = time.monotonic()
+        with self.__lock:
+            self.__expire(now)
+            pending = self.__pending.pop(str(command_id), None)
+            if pending is None:
+                # reply to a command of another client (or already expired)
+                self.unmatched += 1
+                return
+            name, sent_at = pending
+            rtt_ms = (now - sent_at) * 1000
+            self.replied += 1
+            self.last_rtt_ms = rtt_ms
+            self.__histograms.setdefault(name, _RttHistogram()).add(rtt_ms)
+
+    def stats(self) -> dict[str, Any]:
+        with self.__lock:
+            self.__expire(time.monotonic())
+            total = _RttHistogram()
+            for histogram in self.__histograms.values():
+                total.merge(histogram)
+            return {
+                "sent": self.sent,
+                "replied": self.replied,
+                "lost": self.lost,
+                "unmatched": self.unmatched,
+                "pending": len(self.__pending),
+                "last_rtt_ms": (
+                    round(self.last_rtt_ms, 1) if self.last_rtt_ms is not None else None
+                ),
+                "rtt": total.as_dict(),
+                "rtt_by_command": {
+                    name: histogram.as_dict()
+                    for name, histogram in sorted(self.__histograms.items())
+                },
+            }
+
+    def __expire(self, now: float):
+        expired = [
+            command_id
+            for command_id, (_, sent_at) in self.__pending.items()
+            if sent_at + self.__timeout <= now
+        ]
+        for command_id in expired:
+            del self.__pending[command_id]
+        self.lost += len(expired)
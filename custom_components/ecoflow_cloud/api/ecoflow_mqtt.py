@@ -1,31 +1,84 @@
 import logging
 import ssl
-import time
+import threading
 from _socket import SocketType
+from collections.abc import Callable
 from typing import Any
 
 from homeassistant.core import callback
-from paho.mqtt.client import MQTTMessage, PayloadType
+from paho.mqtt.client import MQTTMessage, MQTTMessageInfo, PayloadType
 
-from ..devices import BaseDevice
+from ..payload_log import LazyHex, RateLimitedLog
 from . import EcoflowMqttInfo
+from .ingest import EcoflowIngestQueue
+from .reconnect import EcoflowReconnectManager
+from .router import EcoflowTopicRouter
 
 _LOGGER = logging.getLogger(__name__)
+_publish_log = RateLimitedLog(_LOGGER)
+
+type _ConnectionKey = tuple[str, int, str, str]
+
+# one connection per set of MQTT credentials, shared by all config entries using
+# them (the public API only allows a few client ids per day)
+_connections = dict[_ConnectionKey, "EcoflowMQTTClient"]()
+_connections_lock = threading.Lock()
 
 
 class EcoflowMQTTClient:
-    def __init__(self, mqtt_info: EcoflowMqttInfo, devices: dict[str, BaseDevice]):
-        from ..devices import BaseDevice
+    @classmethod
+    def acquire(
+        cls,
+        mqtt_info: EcoflowMqttInfo,
+        router: EcoflowTopicRouter,
+        ingest: EcoflowIngestQueue,
+    ) -> "EcoflowMQTTClient":
+        key = (mqtt_info.url, mqtt_info.port, mqtt_info.username, mqtt_info.password)
+        with _connections_lock:
+            client = _connections.get(key)
+            if client is None:
+                client = _connections[key] = cls(mqtt_info)
+            else:
+                _LOGGER.info(f"Sharing MQTT connection of {mqtt_info.username}")
+            client.attach(router, ingest)
+        return client
+
+    def release(self, router: EcoflowTopicRouter):
+        with _connections_lock:
+            self.detach(router)
+            if self.__subscribers:
+                return
+            key = (
+                self.__mqtt_info.url,
+                self.__mqtt_info.port,
+                self.__mqtt_info.username,
+                self.__mqtt_info.password,
+            )
+            if _connections.get(key) is self:
+                _connections.pop(key)
+        self.stop()
 
+    def __init__(self, mqtt_info: EcoflowMqttInfo):
         self.connected = False
         self.__mqtt_info = mqtt_info
-        self.__devices: dict[str, BaseDevice] = devices
+        self.__subscribers: tuple[
+            tuple[EcoflowTopicRouter, EcoflowIngestQueue], ...
+        ] = ()
+        self.__subscribed = set[str]()
+        self.__subscriptions_lock = threading.RLock()
+        # mid -> callback (or None) of every publish waiting for its PUBACK
+        self.__on_published: dict[int, Callable[[], None] | None] = {}
+        # mids acknowledged before publish registered them
+        self.__acked = set[int]()
+        self.__published_lock = threading.Lock()
+        self.__reconnects = EcoflowReconnectManager(self.__reconnect)
 
         from homeassistant.components.mqtt.async_client import AsyncMQTTClient
 
         self.__client: AsyncMQTTClient = AsyncMQTTClient(
             client_id=self.__mqtt_info.client_id,
-            reconnect_on_failure=True,
+            # dropped connections are reconnected by the reconnect manager
+            reconnect_on_failure=False,
             clean_session=True,
         )
 
@@ -39,6 +92,7 @@ class EcoflowMQTTClient:
         self.__client.on_connect = self._on_connect
         self.__client.on_disconnect = self._on_disconnect
         self.__client.on_message = self._on_message
+        self.__client.on_publish = self._on_publish
         self.__client.on_socket_close = self._on_socket_close
 
         _LOGGER.info(
@@ -50,12 +104,44 @@ class EcoflowMQTTClient:
     def is_connected(self):
         return self.__client.is_connected()
 
+    def attach(self, router: EcoflowTopicRouter, ingest: EcoflowIngestQueue):
+        self.__subscribers += ((router, ingest),)
+        self.refresh_subscriptions()
+
+    def detach(self, router: EcoflowTopicRouter):
+        self.__subscribers = tuple(s for s in self.__subscribers if s[0] is not router)
+        self.refresh_subscriptions()
+
+    def refresh_subscriptions(self):
+        """Subscribe to new topics and drop topics no client listens to anymore."""
+        with self.__subscriptions_lock:
+            if not self.connected:
+                return
+            target = self.__target_topics()
+            added = [(topic, 1) for topic in target - self.__subscribed]
+            removed = list(self.__subscribed - target)
+            if added:
+                self.__client.subscribe(added)
+                _LOGGER.info(f"Subscribed to MQTT topics {added}")
+            if removed:
+                self.__client.unsubscribe(removed)
+                _LOGGER.info(f"Unsubscribed from MQTT topics {removed}")
+            self.__subscribed = target
+
     def reconnect(self) -> bool:
+        # never blocks: the reconnect manager reconnects on its own thread
+        return self.__reconnects.request()
+
+    def reconnect_stats(self) -> dict[str, Any]:
+        return self.__reconnects.stats()
+
+    def __reconnect(self) -> bool:
         try:
             _LOGGER.info(
                 f"Re-connecting to MQTT Broker {self.__mqtt_info.url}:{self.__mqtt_info.port}"
             )
-            self.__client.loop_stop(True)
+            # the network thread ended with the connection, or is stopped here
+            self.__client.loop_stop()
             self.__client.reconnect()
             self.__client.loop_start()
             return True
@@ -70,12 +156,16 @@ class EcoflowMQTTClient:
     @callback
     def _on_connect(self, client, userdata, flags, rc):
         if rc == 0:
-            self.connected = True
-            target_topics = [(topic, 1) for topic in self.__target_topics()]
-            self.__client.subscribe(target_topics)
-            _LOGGER.info(f"Subscribed to MQTT topics {target_topics}")
+            self.__reconnects.on_connected()
+            with self.__subscriptions_lock:
+                # clean session: the broker forgot all previous subscriptions
+                self.connected = True
+                self.__subscribed = set()
+                self.refresh_subscriptions()
         else:
             self.__log_with_reason("connect", client, userdata, rc)
+            # refused by the broker, retry with a longer backoff
+            self.__reconnects.request()
 
     @callback
     def _on_disconnect(self, client, userdata, rc):
@@ -85,25 +175,40 @@ class EcoflowMQTTClient:
             # when there is a broken pipe error.
             return
         self.connected = False
+        self.__reconnects.on_disconnected()
         if rc != 0:
+            # nothing may sleep on the network thread, the manager reconnects
+            # on its own thread
             self.__log_with_reason("disconnect", client, userdata, rc)
-            time.sleep(5)
+            self.__reconnects.request()
 
     @callback
     def _on_message(self, client, userdata, message: MQTTMessage):
-        try:
-            for sn, device in self.__devices.items():
-                if device.update_data(message.payload, message.topic):
-                    _LOGGER.debug(
-                        f"Message for {sn} and Topic {message.topic} : {message.payload}"
-                    )
-        except UnicodeDecodeError as error:
-            _LOGGER.error(
-                f"UnicodeDecodeError: {error}. Ignoring message and waiting for the next one."
-            )
+        # decoding happens in the ingest workers, keep the network thread free
+        # for keepalives and acks; only clients routing the topic enqueue it
+        for _, ingest in self.__subscribers:
+            if ingest.put(message.topic, message.payload):
+                _LOGGER.debug(
+                    "Message for Topic %s : %s", message.topic, message.payload
+                )
+
+    @callback
+    def _on_publish(self, client, userdata, mid: int):
+        with self.__published_lock:
+            if mid not in self.__on_published:
+                # paho may call this before publish() returned the mid
+                self.__acked.add(mid)
+                return
+            on_published = self.__on_published.pop(mid)
+        if on_published is not None:
+            on_published()
 
     def stop(self):
-        self.__client.unsubscribe(self.__target_topics())
+        self.__reconnects.stop()
+        with self.__subscriptions_lock:
+            if self.__subscribed:
+                self.__client.unsubscribe(list(self.__subscribed))
+            self.__subscribed = set()
         self.__client.loop_stop()
         self.__client.disconnect()
 
@@ -114,31 +219,57 @@ class EcoflowMQTTClient:
             f"MQTT {action}: {mqtt_client.error_string(rc)} ({self.__mqtt_info.client_id}) - {userdata}"
         )
 
-    def publish(self, topic: str, message: PayloadType) -> None:
+    def publish(
+        self,
+        topic: str,
+        message: PayloadType,
+        on_published: Callable[[], None] | None = None,
+    ) -> None:
+        """Publishes with QoS 1, ``on_published`` is called on PUBACK or failure."""
+        info: MQTTMessageInfo | None = None
         try:
             info = self.__client.publish(topic, message, 1)
-            _LOGGER.debug(
-                "Sending "
-                + str(message)
-                + " :"
-                + str(info)
-                + "("
-                + str(info.is_published())
-                + ")"
-            )
+            # raises if the message could not be queued
+            info.is_published()
+            with self.__published_lock:
+                if info.mid in self.__acked:
+                    self.__acked.remove(info.mid)
+                else:
+                    self.__on_published[info.mid] = on_published
+                    on_published = None
+            if on_published is not None:
+                done, on_published = on_published, None
+                done()
+            _LOGGER.debug("Sending %s to %s: %s", LazyHex(message), topic, info)
         except RuntimeError as error:
-            _LOGGER.error(
-                error, "Error on topic " + topic + " and message " + str(message)
+            _publish_log.error(
+                topic,
+                "Error on topic %s: %s",
+                topic,
+                error,
+                payload=message,
             )
+            self.__publish_failed(info, on_published)
         except Exception as error:
-            _LOGGER.debug(
-                error, "Error on topic " + topic + " and message " + str(message)
-            )
+            _LOGGER.debug("Error on topic %s: %s (%s)", topic, error, LazyHex(message))
+            self.__publish_failed(info, on_published)
+
+    def __publish_failed(
+        self, info: MQTTMessageInfo | None, on_published: Callable[[], None] | None
+    ) -> None:
+        # no PUBACK will come, release whoever waits for it (e.g. a command slot)
+        if info is not None:
+            with self.__published_lock:
+                self.__acked.discard(info.mid)
+                on_published = self.__on_published.pop(info.mid, on_published)
+                # paho may still send a queued message, its PUBACK is ignored
+                self.__on_published[info.mid] = None
+        if on_published is not None:
+            on_published()
 
-    def __target_topics(self) -> list[str]:
-        topics = []
-        for device in self.__devices.values():
-            for topic in device.device_info.topics():
-                topics.append(topic)
-        # Remove duplicates that can occur when multiple devices have the same topic (for example sub devices)
-        return list(set(topics))
+    def __target_topics(self) -> set[str]:
+        # a router holds every topic once, even when shared by sub devices
+        topics = set[str]()
+        for router, _ in self.__subscribers:
+            topics.update(router.topics())
+        return topics
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+from .router import EcoflowTopicRoute, EcoflowTopicRouter
+
+if TYPE_CHECKING:
+    from ..device_data import DeviceData
+    from ..devices import BaseDevice, EcoflowDeviceInfo
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_DEPTH = 256
+DEFAULT_DECODE_WORKERS = 2
+DEFAULT_PROCESS_WORKERS = 1
+# logger of the integration, records of worker processes are logged again here
+_PACKAGE = __name__.rsplit(".", 2)[0]
+
+
+class EcoflowIngestQueue:
+    """Bounded queue between the MQTT network thread and the decode executor.
+
+    The network thread only enqueues the raw payload. Payloads are decoded by a
+    thread pool, or by a process pool for devices with the ``process_decode``
+    option; what decoders observe and log in a worker process is recorded in Home
+    Assistant's process. Messages of one device are decoded in order, one at a
+    time. When the queue is full, the oldest pending message of the same device is
+    dropped (or of the device with most pending messages, if that device has none
+    queued).
+    """
+
+    def __init__(
+        self,
+        router: EcoflowTopicRouter,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        decode_workers: int = DEFAULT_DECODE_WORKERS,
+        process_workers: int = DEFAULT_PROCESS_WORKERS,
+    ) -> None:
+        self.__router = router
+        self.max_depth = max_depth
+        self.__process_workers = process_workers
+        self.__lock = threading.Lock()
+        self.__pending: dict[str, deque[tuple[EcoflowTopicRoute, bytes]]] = {}
+        self.__busy = set[str]()
+        self.__executor: Executor = ThreadPoolExecutor(
+            max_workers=decode_workers, thread_name_prefix="ecoflow_decode"
+        )
+        self.__process_pool: Executor | None = None
+
+        self.depth = 0
+        self.max_seen_depth = 0
+        self.received = 0
+        self.dropped = 0
+        self.dropped_by_device = dict[str, int]()
+
+    def put(self, topic: str, payload: bytes) -> bool:
+        route = self.__router.route(topic)
+        if route is None:
+            return False
+
+        key = route.device_sn
+        with self.__lock:
+            self.received += 1
+            queue = self.__pending.setdefault(key, deque())
+            if self.depth >= self.max_depth:
+                victim_key = key if queue else max(
+                    self.__pending, key=lambda k: len(self.__pending[k])
+                )
+                self.__pending[victim_key].popleft()
+                self.depth -= 1
+                self.dropped += 1
+                self.dropped_by_device[victim_key] = (
+                    self.dropped_by_device.get(victim_key, 0) + 1
+                )
+            queue.append((route, payload))
+            self.depth += 1
+            self.max_seen_depth = max(self.max_seen_depth, self.depth)
+            start = key not in self.__busy
+            if start:
+                self.__busy.add(key)
+
+        if start:
+            self.__executor.submit(self.__drain, key)
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        with self.__lock:
+            return {
+                "depth": self.depth,
+                "max_depth": self.max_depth,
+                "max_seen_depth": self.max_seen_depth,
+                "received": self.received,
+                "dropped": self.dropped,
+                "dropped_by_device": dict(self.dropped_by_device),
+                "depth_by_device": {k: len(v) for k, v in self.__pending.items()},
+            }
+
+    def stop(self):
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+        if self.__process_pool is not None:
+            self.__process_pool.shutdown(wait=False, cancel_futures=True)
+
+    def __drain(self, key: str):
+        while True:
+            with self.__lock:
+                queue = self.__pending.get(key)
+                if not queue:
+                    self.__pending.pop(key, None)
+                    self.__busy.discard(key)
+                    return
+                route, payload = queue.popleft()
+                self.depth -= 1
+
+            try:
+                self.__handle(route, payload)
+            except UnicodeDecodeError as error:
+                _LOGGER.error(
+                    "UnicodeDecodeError: %s. Ignoring message and waiting for the next one.",
+                    error,
+                )
+            except Exception as error:
+                _LOGGER.error("Error handling message for %s: %s", key, error)
+
+    def __handle(self, route: EcoflowTopicRoute, payload: bytes):
+        for fanout in route.fanouts:
+            device = fanout.device
+            sampled = fanout.sample_keys and device.telemetry.sample_keys()
+            if device.device_data.options.process_decode:
+                # worker processes decode completely, their devices are not set up
+                raw, records = (
+                    self.__get_process_pool()
+                    .submit(
+                        _decode_in_process,
+                        type(device),
+                        device.device_info,
+                        device.device_data,
+                        fanout.prepare.__name__,
+                        payload,
+                        logging.getLogger(_PACKAGE).getEffectiveLevel(),
+                    )
+                    .result()
+                )
+                _replay_records(records)
+            elif sampled:
+                # projected decoders skip unknown keys, decode this one completely
+                with device.projection.bypassed():
+                    raw = fanout.prepare(payload)
+            else:
+                raw = fanout.prepare(payload)
+            # side effects of the decode are recorded here, not in the decoder
+            fanout.dispatch(device.record_decode(raw, sampled))
+
+    def __get_process_pool(self) -> Executor:
+        with self.__lock:
+            if self.__process_pool is None:
+                # never fork the (multi threaded) Home Assistant process
+                self.__process_pool = ProcessPoolExecutor(
+                    max_workers=self.__process_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self.__process_pool
+
+
+def _replay_records(records: list[logging.LogRecord]):
+    for record in records:
+        logger = logging.getLogger(record.name)
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
+
+
+class _RecordCollector(logging.Handler):
+    """Keeps the records logged while a worker process decodes a payload."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.records = list[logging.LogRecord]()
+
+    def emit(self, record: logging.LogRecord):
+        # arguments (e.g. lazy payload dumps) are formatted here, records are
+        # pickled back to Home Assistant's process
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self.records.append(record)
+
+
+_process_devices = dict[tuple[type, str], "BaseDevice"]()
+_process_records: _RecordCollector | None = None
+
+
+def _decode_in_process(
+    device_type: type[BaseDevice],
+    device_info: EcoflowDeviceInfo,
+    device_data: DeviceData,
+    prepare_name: str,
+    payload: bytes,
+    log_level: int,
+) -> tuple[dict[str, Any], list[logging.LogRecord]]:
+    global _process_records
+    if _process_records is None:
+        _process_records = _RecordCollector()
+        logging.getLogger(_PACKAGE).addHandler(_process_records)
+    logging.getLogger(_PACKAGE).setLevel(log_level)
+
+    # decoders only depend on the device description, not on Home Assistant state
+    key = (device_type, device_data.sn)
+    device = _process_devices.get(key)
+    if device is None:
+        device = _process_devices[key] = device_type(device_info, device_data)
+    try:
+        raw = getattr(device, prepare_name)(payload)
+        return raw, _process_records.records
+    finally:
+        _process_records.records = []
@@ -7,6 +7,9 @@ from paho.mqtt.client import PayloadType
 
 
 class Message(ABC):
+    # id/seq stamped into the last payload built from this message
+    command_id: str | None = None
+
     @abstractmethod
     def to_mqtt_payload(self) -> PayloadType:
         raise NotImplementedError()
@@ -37,4 +40,6 @@ class JSONMessage(Message):
 
     @override
     def to_mqtt_payload(self) -> PayloadType:
-        return json.dumps(JSONMessage.prepare_payload(self.data))
+        payload = JSONMessage.prepare_payload(self.data)
+        self.command_id = str(payload["id"])
+        return json.dumps(payload)
@@ -180,9 +180,8 @@ class EcoflowPrivateApiClient(EcoflowApiClient):
     ):
         if isinstance(command, PrivateAPIMessageProtocol):
             self.devices[device_sn].data.update_to_target_state(mqtt_state)
-            self.mqtt_client.publish(
-                self.devices[device_sn].device_info.set_topic,
-                command.private_api_to_mqtt_payload(),
+            self._queue_set_message(
+                device_sn, mqtt_state, command, command.private_api_to_mqtt_payload
             )
         else:
             super().send_set_message(device_sn, mqtt_state, command)
@@ -0,0 +1,149 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class EcoflowReconnectManager:
+    """Owns the reconnection of one MQTT connection.
+
+    Dropped connections and explicit requests (status sensors) are both
+    reconnected here, paho's own reconnect loop is disabled. Reconnects run on a
+    timer thread after an exponential backoff with jitter, so neither the event
+    loop nor the MQTT network thread is blocked. Only one reconnect is in flight
+    at a time, requests arriving meanwhile are coalesced into it. The backoff
+    grows with every attempt until the broker accepts a connection.
+    """
+
+    def __init__(
+        self,
+        reconnect: Callable[[], bool],
+        base_delay: float = 1.0,
+        max_delay: float = 300.0,
+        storm_window: float = 60.0,
+        storm_threshold: int = 5,
+    ) -> None:
+        self.__reconnect = reconnect
+        self.__base_delay = base_delay
+        self.__max_delay = max_delay
+        self.__storm_window = storm_window
+        self.__storm_threshold = storm_threshold
+
+        self.__lock = threading.Lock()
+        self.__timer: threading.Timer | None = None
+        self.__in_flight = False
+        # attempts since the last accepted connection, sets the backoff
+        self.__attempts_since_connected = 0
+        self.__disconnected_at: float | None = None
+        self.__recent_requests = deque[float]()
+        self.__in_storm = False
+        self.__stopped = False
+
+        self.requests = 0
+        self.coalesced_requests = 0
+        self.attempts = 0
+        self.failures = 0
+        self.storms = 0
+        self.last_time_to_reconnect: float | None = None
+        self.max_time_to_reconnect: float | None = None
+
+    def request(self) -> bool:
+        """Ask for a reconnect, returns False if one is already in flight."""
+        now = time.monotonic()
+        with self.__lock:
+            self.requests += 1
+            self.__track_storm(now)
+            if self.__stopped:
+                return False
+            if self.__in_flight:
+                self.coalesced_requests += 1
+                return False
+            self.__in_flight = True
+            self.__schedule()
+        return True
+
+    def on_disconnected(self):
+        with self.__lock:
+            if self.__disconnected_at is None:
+                self.__disconnected_at = time.monotonic()
+
+    def on_connected(self):
+        with self.__lock:
+            self.__attempts_since_connected = 0
+            if self.__disconnected_at is None:
+                return
+            elapsed = time.monotonic() - self.__disconnected_at
+            self.__disconnected_at = None
+            self.last_time_to_reconnect = elapsed
+            self.max_time_to_reconnect = max(self.max_time_to_reconnect or 0, elapsed)
+
+    def stop(self):
+        with self.__lock:
+            self.__stopped = True
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+
+    def stats(self) -> dict[str, Any]:
+        with self.__lock:
+            return {
+                "in_flight": self.__in_flight,
+                "requests": self.requests,
+                "coalesced_requests": self.coalesced_requests,
+                "attempts": self.attempts,
+                "failures": self.failures,
+                "storms": self.storms,
+                "last_time_to_reconnect": self.last_time_to_reconnect,
+                "max_time_to_reconnect": self.max_time_to_reconnect,
+            }
+
+    def __schedule(self):
+        delay = min(
+            self.__max_delay, self.__base_delay * 2**self.__attempts_since_connected
+        )
+        # "equal jitter": keep half of the backoff, randomize the other half
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        _LOGGER.debug("Reconnecting to MQTT Broker in %.1f sec", delay)
+        self.__timer = threading.Timer(delay, self.__run)
+        self.__timer.daemon = True
+        self.__timer.start()
+
+    def __run(self):
+        with self.__lock:
+            if self.__stopped:
+                return
+            self.attempts += 1
+            self.__attempts_since_connected += 1
+            if self.__disconnected_at is None:
+                self.__disconnected_at = time.monotonic()
+
+        success = self.__reconnect()
+
+        with self.__lock:
+            self.__timer = None
+            if success or self.__stopped:
+                self.__in_flight = False
+                return
+            self.failures += 1
+            self.__schedule()
+
+    def __track_storm(self, now: float):
+        self.__recent_requests.append(now)
+        while self.__recent_requests[0] < now - self.__storm_window:
+            self.__recent_requests.popleft()
+        if len(self.__recent_requests) >= self.__storm_threshold:
+            if not self.__in_storm:
+                self.__in_storm = True
+                self.storms += 1
+                _LOGGER.warning(
+                    "%d MQTT reconnect requests within %d sec",
+                    len(self.__recent_requests),
+                    self.__storm_window,
+                )
+        else:
+            self.__in_storm = False
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from ..devices import BaseDevice, EcoflowTopicHandler
+
+type _Route = tuple[BaseDevice, EcoflowTopicHandler]
+type _Apply = Callable[[dict[str, Any]], None]
+
+
+class _TopicFanout:
+    """Devices of one topic that decode a payload the same way.
+
+    The payload is decoded once and handed to every device of the group. Handlers
+    that only accept data of their own module (sub devices, e.g. PowerKit) are
+    indexed by module SN, so they do not see the payloads of their siblings.
+    """
+
+    def __init__(self, device: BaseDevice, handler: EcoflowTopicHandler) -> None:
+        # the first device of the group decodes on behalf of all of them
+        self.device = device
+        self.prepare = handler.prepare
+        self.sample_keys = handler.sample_keys
+        self.applies: tuple[_Apply, ...] = ()
+        self.unfiltered: tuple[_Apply, ...] = ()
+        self.by_module: dict[str, tuple[_Apply, ...]] = {}
+
+    def add(self, device: BaseDevice, handler: EcoflowTopicHandler):
+        self.applies += (handler.apply,)
+        module_sn = device.device_data.sn if device.device_data.parent else None
+        if handler.module_filtered and module_sn is not None:
+            self.by_module[module_sn] = self.by_module.get(module_sn, ()) + (
+                handler.apply,
+            )
+        else:
+            self.unfiltered += (handler.apply,)
+
+    def dispatch(self, raw: dict[str, Any]):
+        if not self.by_module:
+            targets = self.applies
+        elif isinstance(raw, dict):
+            targets = self.unfiltered + self.by_module.get(raw.get("moduleSn"), ())
+        else:
+            targets = self.unfiltered
+        for apply in targets:
+            apply(raw)
+
+
+class EcoflowTopicRoute:
+    def __init__(self, routes: tuple[_Route, ...]) -> None:
+        self.routes = routes
+        # all devices of a topic share the SN of the topic (sub devices use the
+        # parent's topics)
+        self.device_sn: str = routes[0][0].device_info.sn
+        fanouts = dict[Any, _TopicFanout]()
+        for device, handler in routes:
+            # bound methods of different instances share the same function,
+            # the device class decides how that function decodes
+            prepare = getattr(handler.prepare, "__func__", handler.prepare)
+            fanout = fanouts.setdefault(
+                (type(device), prepare), _TopicFanout(device, handler)
+            )
+            fanout.add(device, handler)
+        self.fanouts = tuple(fanouts.values())
+
+
+class EcoflowTopicRouter:
+    """Index of MQTT topics to the devices (and their handlers) listening on them.
+
+    Routes are replaced copy-on-write, so the MQTT network thread can look them up
+    while devices are added or removed on the event loop.
+    """
+
+    def __init__(self) -> None:
+        self.__routes: dict[str, EcoflowTopicRoute] = {}
+
+    def add_device(self, device: BaseDevice):
+        for topic, handler in device.topic_handlers().items():
+            current = self.__routes.get(topic)
+            routes = current.routes if current is not None else ()
+            self.__routes[topic] = EcoflowTopicRoute(routes + ((device, handler),))
+
+    def remove_device(self, device: BaseDevice):
+        for topic, current in list(self.__routes.items()):
+            remaining = tuple(r for r in current.routes if r[0] is not device)
+            if len(remaining) == len(current.routes):
+                continue
+            if remaining:
+                self.__routes[topic] = EcoflowTopicRoute(remaining)
+            else:
+                self.__routes.pop(topic, None)
+
+    def route(self, topic: str) -> EcoflowTopicRoute | None:
+        return self.__routes.get(topic)
+
+    def topics(self) -> list[str]:
+        return list(self.__routes)
@@ -2,11 +2,12 @@ import logging
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import ECOFLOW_DOMAIN
+from . import ECOFLOW_DOMAIN, async_track_devices
 from .api import EcoflowApiClient
+from .devices import BaseDevice
 from .entities import BaseButtonEntity
 
 _LOGGER = logging.getLogger(__name__)
@@ -16,9 +17,13 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ):
     client: EcoflowApiClient = hass.data[ECOFLOW_DOMAIN][entry.entry_id]
-    for sn, device in client.devices.items():
+
+    @callback
+    def add_device_entities(device: BaseDevice):
         async_add_entities(device.buttons(client))
 
+    async_track_devices(hass, entry, add_device_entities)
+
 
 class EnabledButtonEntity(BaseButtonEntity):
     def press(self, **kwargs: Any) -> None:
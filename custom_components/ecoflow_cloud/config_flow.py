@@ -6,6 +6,7 @@ from typing import Any, Dict
 import voluptuous as vol
 from homeassistant.config_entries import (
     ConfigEntry,
+    ConfigEntryState,
     ConfigFlow,
     OptionsFlowWithConfigEntry,
 )
@@ -32,8 +33,10 @@ from . import (
     CONFIG_VERSION,
     DEFAULT_REFRESH_PERIOD_SEC,
     ECOFLOW_DOMAIN,
+    OPTS_COALESCE_WINDOW_MS,
     OPTS_DIAGNOSTIC_MODE,
     OPTS_POWER_STEP,
+    OPTS_PROCESS_DECODE,
     OPTS_REFRESH_PERIOD_SEC,
     DeviceData,
     DeviceOptions,
@@ -81,10 +84,12 @@ class EcoflowConfigFlow(ConfigFlow, domain=ECOFLOW_DOMAIN):
                 str(self.new_data),
                 str(self.new_options),
             )
-            if self.hass.config_entries.async_update_entry(
+            # the update listener adds/removes devices live or reloads the entry
+            self.hass.config_entries.async_update_entry(
                 entry=self.config_entry, data=self.new_data, options=self.new_options
-            ):
-                # reload if changed
+            )
+            if self.config_entry.state is not ConfigEntryState.LOADED:
+                # the listener is only registered by a successful setup
                 self.hass.config_entries.async_schedule_reload(
                     self.config_entry.entry_id
                 )
@@ -519,6 +524,13 @@ class EcoflowOptionsFlow(OptionsFlowWithConfigEntry):
                         vol.Required(
                             OPTS_DIAGNOSTIC_MODE, default=device_options.diagnostic_mode
                         ): bool,
+                        vol.Required(
+                            OPTS_PROCESS_DECODE, default=device_options.process_decode
+                        ): bool,
+                        vol.Required(
+                            OPTS_COALESCE_WINDOW_MS,
+                            default=device_options.coalesce_window_ms,
+                        ): vol.All(int, vol.Range(min=0, max=60000)),
                     }
                 ),
             )
@@ -528,6 +540,8 @@ class EcoflowOptionsFlow(OptionsFlowWithConfigEntry):
             OPTS_POWER_STEP: user_input[OPTS_POWER_STEP],
             OPTS_REFRESH_PERIOD_SEC: user_input[OPTS_REFRESH_PERIOD_SEC],
             OPTS_DIAGNOSTIC_MODE: user_input[OPTS_DIAGNOSTIC_MODE],
+            OPTS_PROCESS_DECODE: user_input[OPTS_PROCESS_DECODE],
+            OPTS_COALESCE_WINDOW_MS: user_input[OPTS_COALESCE_WINDOW_MS],
         }
 
         return self.async_create_entry(title="", data=new_options)
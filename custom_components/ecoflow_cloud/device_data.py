@@ -8,6 +8,8 @@ class DeviceOptions:
     refresh_period: int
     power_step: int
     diagnostic_mode: bool
+    process_decode: bool = False
+    coalesce_window_ms: int = 0
 
 
 @dataclasses.dataclass
@@ -1,24 +1,33 @@
 import dataclasses
 import datetime
-import json
+import importlib
 import logging
 from abc import ABC, abstractmethod
-from collections.abc import Sequence
-from typing import Any, cast
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any, NamedTuple, cast
 
 from homeassistant.components.button import ButtonEntity
 from homeassistant.components.number import NumberEntity
 from homeassistant.components.select import SelectEntity
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.components.switch import SwitchEntity
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.util import dt
 
 from ..api import EcoflowApiClient
+from ..api.commands import EcoflowCommandTracker
 from ..api.message import JSONDict, JSONMessage, Message
 from ..device_data import DeviceData
+from ..payload_log import PAYLOAD_SAMPLE_EVERY, PayloadSampler
 from .data_holder import EcoflowDataHolder
+from .json_decode import decode_json
+from .projection import EcoflowKeyProjection
+from .telemetry import (
+    OBSERVATIONS_KEY,
+    EcoflowDecodeObservations,
+    EcoflowUnknownTelemetry,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -51,10 +60,22 @@ class EcoflowDeviceInfo:
         return list(filter(lambda v: v is not None, topics))
 
 
+class EcoflowTopicHandler(NamedTuple):
+    prepare: Callable[[bytes], dict[str, Any]]
+    apply: Callable[[dict[str, Any]], None]
+    # only data of the holder's own module is accepted (see EcoflowDataHolder)
+    module_filtered: bool = False
+    # a sample of the messages is checked for unknown params keys
+    sample_keys: bool = False
+
+
 @dataclasses.dataclass
 class EcoflowBroadcastDataHolder:
     data_holder: EcoflowDataHolder
     changed: bool
+    # params keys whose value changed since the last broadcast, None if unknown
+    changed_keys: frozenset[str] | None = None
+    version: int = 0
 
 
 class NoQuotaMessageError(Exception):
@@ -62,6 +83,13 @@ class NoQuotaMessageError(Exception):
 
 
 class EcoflowDeviceUpdateCoordinator(DataUpdateCoordinator[EcoflowBroadcastDataHolder]):
+    """Broadcasts the data holder of a device every refresh period.
+
+    Listeners added with a frozenset of params keys as context are kept in a key
+    index and only called when one of their keys changed (and once after they
+    subscribed), all others on every refresh.
+    """
+
     def __init__(self, hass, holder: EcoflowDataHolder, refresh_period: int) -> None:
         """Initialize the coordinator."""
         super().__init__(
@@ -75,15 +103,89 @@ class EcoflowDeviceUpdateCoordinator(DataUpdateCoordinator[EcoflowBroadcastDataH
         self.__last_broadcast = dt.utcnow().replace(
             year=2000, month=1, day=1, hour=0, minute=0, second=0
         )
+        # listeners by params key and keys by listener, dicts as ordered sets
+        self.__by_key = dict[str, dict[CALLBACK_TYPE, None]]()
+        self.__keyed = dict[CALLBACK_TYPE, frozenset[str]]()
+        # listeners not called since they subscribed
+        self.__unsynced = dict[CALLBACK_TYPE, None]()
+        self.__remove_dispatch: CALLBACK_TYPE | None = None
+        holder.target_listener = self.__targets_changed
+
+    @callback
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE, context: Any = None
+    ) -> Callable[[], None]:
+        if not isinstance(context, frozenset):
+            return super().async_add_listener(update_callback, context)
+
+        self.__keyed[update_callback] = context
+        self.__unsynced[update_callback] = None
+        for key in context:
+            self.__by_key.setdefault(key, {})[update_callback] = None
+        if self.__remove_dispatch is None:
+            # the index is one listener, it keeps the refreshes scheduled
+            self.__remove_dispatch = super().async_add_listener(self.__dispatch)
+
+        @callback
+        def remove_listener() -> None:
+            keys = self.__keyed.pop(update_callback, frozenset())
+            self.__unsynced.pop(update_callback, None)
+            for key in keys:
+                listeners = self.__by_key.get(key)
+                if listeners is not None:
+                    listeners.pop(update_callback, None)
+                    if not listeners:
+                        del self.__by_key[key]
+            if not self.__keyed and self.__remove_dispatch is not None:
+                self.__remove_dispatch()
+                self.__remove_dispatch = None
+
+        return remove_listener
+
+    @callback
+    def __targets_changed(self) -> None:
+        # command targets are shown right away, not at the next refresh
+        self.hass.async_create_background_task(
+            self.async_request_refresh(), f"{self.name} target state"
+        )
+
+    @callback
+    def __dispatch(self) -> None:
+        data = self.data
+        if data is None:
+            return
+        targets, self.__unsynced = self.__unsynced, {}
+        if data.changed and data.changed_keys is None:
+            targets = dict.fromkeys(self.__keyed)
+        elif data.changed:
+            by_key = self.__by_key
+            for key in data.changed_keys:
+                listeners = by_key.get(key)
+                if listeners is not None:
+                    targets.update(listeners)
+        for update_callback in list(targets):
+            # a listener may remove another one
+            if update_callback in self.__keyed:
+                update_callback()
 
     async def _async_update_data(self) -> EcoflowBroadcastDataHolder:
         received_time = self.holder.last_received_time()
         changed = self.__last_broadcast < received_time
         self.__last_broadcast = received_time
-        return EcoflowBroadcastDataHolder(self.holder, changed)
+        return EcoflowBroadcastDataHolder(
+            self.holder,
+            changed,
+            self.holder.take_changed_keys(),
+            self.holder.version,
+        )
 
 
 class BaseDevice(ABC):
+    # reject payloads that are not valid UTF-8 instead of dropping invalid bytes
+    strict_json: bool = False
+    # protobuf modules (of devices.internal.proto) used to decode the payloads
+    proto_modules: tuple[str, ...] = ()
+
     def __init__(self, device_info: EcoflowDeviceInfo, device_data: DeviceData):
         super().__init__()
         self.coordinator = None
@@ -91,6 +193,16 @@ class BaseDevice(ABC):
         self.device_info: EcoflowDeviceInfo = device_info
         self.power_step: int = device_data.options.power_step
         self.device_data: DeviceData = device_data
+        self.command_tracker = EcoflowCommandTracker()
+        self.telemetry = EcoflowUnknownTelemetry()
+        # decoders log every payload in diagnostic mode, a sample otherwise
+        self.payload_log = PayloadSampler(
+            1 if device_data.options.diagnostic_mode else PAYLOAD_SAMPLE_EVERY
+        )
+        # nested keys are jsonpath expressions, only flat keys can be projected
+        self.projection = EcoflowKeyProjection(
+            self.flat_json() and not device_data.options.diagnostic_mode
+        )
 
     def configure(self, hass: HomeAssistant):
         if self.device_data.parent is not None:
@@ -98,12 +210,18 @@ class BaseDevice(ABC):
                 self.private_api_extract_quota_message,
                 self.device_data.sn,
                 self.device_data.options.diagnostic_mode,
+                hass.loop,
+                self.device_data.options.coalesce_window_ms / 1000,
+                self.projection,
             )
         else:
             self.data = EcoflowDataHolder(
                 self.private_api_extract_quota_message,
                 None,
                 self.device_data.options.diagnostic_mode,
+                hass.loop,
+                self.device_data.options.coalesce_window_ms / 1000,
+                self.projection,
             )
         self.coordinator = EcoflowDeviceUpdateCoordinator(
             hass, self.data, self.device_data.options.refresh_period
@@ -161,28 +279,93 @@ class BaseDevice(ABC):
     def buttons(self, client: EcoflowApiClient) -> Sequence[ButtonEntity]:
         return []
 
-    def update_data(self, raw_data: bytes, data_type: str) -> bool:
-        if data_type == self.device_info.data_topic:
-            raw = self._prepare_data_data_topic(raw_data)
-            self.data.update_data(raw)
-        elif data_type == self.device_info.set_topic:
-            raw = self._prepare_data_set_topic(raw_data)
-            self.data.add_set_message(raw)
-        elif data_type == self.device_info.set_reply_topic:
-            raw = self._prepare_data_set_reply_topic(raw_data)
-            self.data.add_set_reply_message(raw)
-        elif data_type == self.device_info.get_topic:
-            raw = self._prepare_data_get_topic(raw_data)
-            self.data.add_get_message(raw)
-        elif data_type == self.device_info.get_reply_topic:
-            raw = self._prepare_data_get_reply_topic(raw_data)
-            self.data.add_get_reply_message(raw)
-        elif data_type == self.device_info.status_topic:
-            raw = self._prepare_data_status_topic(raw_data)
-            self.data.update_status(raw)
-        else:
-            return False
-        return True
+    def topic_handlers(self) -> dict[str, EcoflowTopicHandler]:
+        handlers = dict[str, EcoflowTopicHandler]()
+        for topic, handler in (
+            (
+                self.device_info.data_topic,
+                EcoflowTopicHandler(
+                    self._prepare_data_data_topic, self._apply_data_topic, True, True
+                ),
+            ),
+            (
+                self.device_info.set_topic,
+                EcoflowTopicHandler(
+                    self._prepare_data_set_topic, self._apply_set_topic
+                ),
+            ),
+            (
+                self.device_info.set_reply_topic,
+                EcoflowTopicHandler(
+                    self._prepare_data_set_reply_topic, self._apply_set_reply_topic
+                ),
+            ),
+            (
+                self.device_info.get_topic,
+                EcoflowTopicHandler(
+                    self._prepare_data_get_topic, self._apply_get_topic
+                ),
+            ),
+            (
+                self.device_info.get_reply_topic,
+                EcoflowTopicHandler(
+                    self._prepare_data_get_reply_topic, self._apply_get_reply_topic
+                ),
+            ),
+            (
+                self.device_info.status_topic,
+                EcoflowTopicHandler(
+                    self._prepare_data_status_topic, self._apply_status_topic
+                ),
+            ),
+        ):
+            # first match wins, like the former if/elif chain
+            if topic is not None and topic not in handlers:
+                handlers[topic] = handler
+        return handlers
+
+    def record_decode(self, raw: Any, sampled: bool = False) -> Any:
+        """Records what decoding ``raw`` observed, returns the message to apply.
+
+        ``sampled`` marks a data message decoded completely for the unknown key
+        telemetry (see ``EcoflowUnknownTelemetry.sample_keys``).
+        """
+        if isinstance(raw, dict):
+            observations = raw.pop(OBSERVATIONS_KEY, None)
+            if observations is not None:
+                self._record_observations(observations)
+            if sampled:
+                self.telemetry.observe_params(raw.get("params"))
+        return raw
+
+    def _record_observations(self, observations: EcoflowDecodeObservations):
+        for cmd_func, cmd_id, payload in observations.unknown_commands:
+            if self.telemetry.unknown_command(cmd_func, cmd_id, payload):
+                _LOGGER.info(
+                    "Unsupported EcoPacket cmd_func %u, cmd_id %u from %s",
+                    cmd_func,
+                    cmd_id,
+                    self.device_data.sn,
+                )
+
+    def _apply_data_topic(self, raw: dict[str, Any]):
+        self.data.update_data(raw)
+
+    def _apply_set_topic(self, raw: dict[str, Any]):
+        self.data.add_set_message(raw)
+
+    def _apply_set_reply_topic(self, raw: dict[str, Any]):
+        self.command_tracker.reply_received(raw)
+        self.data.add_set_reply_message(raw)
+
+    def _apply_get_topic(self, raw: dict[str, Any]):
+        self.data.add_get_message(raw)
+
+    def _apply_get_reply_topic(self, raw: dict[str, Any]):
+        self.data.add_get_reply_message(raw)
+
+    def _apply_status_topic(self, raw: dict[str, Any]):
+        self.data.update_status(raw)
 
     def _prepare_data_data_topic(self, raw_data: bytes) -> dict[str, Any]:
         return self._prepare_data(raw_data)
@@ -203,21 +386,7 @@ class BaseDevice(ABC):
         return self._prepare_data(raw_data)
 
     def _prepare_data(self, raw_data: bytes) -> dict[str, Any]:
-        try:
-            try:
-                payload = raw_data.decode("utf-8", errors="ignore")
-                return json.loads(payload)
-            except UnicodeDecodeError as error:
-                _LOGGER.warning(f"UnicodeDecodeError: {error}. Trying to load json.")
-                return json.loads(raw_data)
-            except Exception as error:
-                _LOGGER.warning(f"Exception: {error}. Trying to load json.")
-                return json.loads(raw_data)
-        except Exception as error1:
-            _LOGGER.error(
-                f"constant: {error1}. Ignoring message and waiting for the next one."
-            )
-            return {}
+        return decode_json(raw_data, self.device_data.sn, self.strict_json)
 
 
 class DiagnosticDevice(BaseDevice):
@@ -235,3 +404,21 @@ class DiagnosticDevice(BaseDevice):
 
     def selects(self, client: EcoflowApiClient) -> Sequence[SelectEntity]:
         return []
+
+
+def load_device_modules(device_types: Iterable[str]) -> None:
+    """Imports the device registry and the protobuf modules of ``device_types``.
+
+    Building the protobuf descriptors is slow, so only the modules of configured
+    devices are loaded. Blocking, run it in the executor before configuring.
+    """
+    from .registry import devices
+
+    modules = {
+        module
+        for device_type in device_types
+        if device_type in devices
+        for module in devices[device_type].proto_modules
+    }
+    for module in sorted(modules):
+        importlib.import_module(f"{__package__}.internal.proto.{module}")
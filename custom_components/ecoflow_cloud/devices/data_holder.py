@@ -1,25 +1,20 @@
+import asyncio
 import logging
+import threading
+import time
 from collections.abc import Callable
-from typing import Any, TypeVar
+from typing import Any
 
 import json
-import jsonpath_ng.ext as jp
 from homeassistant.util import dt
 
-_LOGGER = logging.getLogger(__name__)
-
-_T = TypeVar("_T")
-
+from .history import EcoflowHistory, device_budget
+from .projection import EcoflowKeyProjection
+from .target_state import EcoflowTargetState
 
-class BoundFifoList(list):
-    def __init__(self, maxlen=20) -> None:
-        super().__init__()
-        self.maxlen = maxlen
+_LOGGER = logging.getLogger(__name__)
 
-    def append(self, __object: _T) -> None:
-        super().insert(0, __object)
-        while len(self) >= self.maxlen:
-            self.pop()
+_MISSING = object()
 
 
 class EcoflowDataHolder:
@@ -28,19 +23,43 @@ class EcoflowDataHolder:
         extract_quota_message: Callable[[dict[str, Any]], dict[str, Any]],
         module_sn: str | None = None,
         collect_raw: bool = False,
+        loop: asyncio.AbstractEventLoop | None = None,
+        coalesce_window: float = 0,
+        projection: EcoflowKeyProjection | None = None,
     ):
         self.__collect_raw = collect_raw
+        self.__projection = projection
+        # all mutations happen on this loop, other threads hand them off
+        self.__loop = loop
+        self.__pending_lock = threading.Lock()
+        self.__pending = list[tuple[Callable[[Any], None] | None, Any]]()
+        self.__flush_scheduled = False
+        # seconds to collect incoming messages before they are merged
+        self.__coalesce_window = coalesce_window
+        self.data_messages = 0
+        self.params_merges = 0
+        # bumped by every merge that changes a value of params
+        self.version = 0
+        # keys changed since the last take_changed_keys, None if unknown
+        self.__changed_keys: set[str] | None = set()
+        # command targets shown before the device confirms them
+        self.targets = EcoflowTargetState()
+        self.__expire_timer: asyncio.TimerHandle | None = None
+        # called on the loop when targets are applied or rolled back
+        self.target_listener: Callable[[], None] | None = None
         self.extract_quota_message = extract_quota_message
-        self.set = BoundFifoList[dict[str, Any]]()
-        self.set_reply = BoundFifoList[dict[str, Any]]()
+        # bytes of the message histories of this device, within the global budget
+        self.history_budget = device_budget()
+        self.set = EcoflowHistory(self.history_budget)
+        self.set_reply = EcoflowHistory(self.history_budget)
         self.set_reply_time = dt.utcnow().replace(
             year=2000, month=1, day=1, hour=0, minute=0, second=0
         )
 
         self.module_sn = module_sn
 
-        self.get = BoundFifoList[dict[str, Any]]()
-        self.get_reply = BoundFifoList[dict[str, Any]]()
+        self.get = EcoflowHistory(self.history_budget)
+        self.get_reply = EcoflowHistory(self.history_budget)
         self.get_reply_time = dt.utcnow().replace(
             year=2000, month=1, day=1, hour=0, minute=0, second=0
         )
@@ -55,7 +74,35 @@ class EcoflowDataHolder:
             year=2000, month=1, day=1, hour=0, minute=0, second=0
         )
 
-        self.raw_data = BoundFifoList[dict[str, Any]]()
+        self.raw_data = EcoflowHistory(self.history_budget)
+
+    def merge_stats(self) -> dict[str, Any]:
+        return {
+            "coalesce_window": self.__coalesce_window,
+            "data_messages": self.data_messages,
+            "params_merges": self.params_merges,
+            "merged_messages": self.data_messages - self.params_merges,
+        }
+
+    def history_stats(self) -> dict[str, Any]:
+        return {
+            "bytes": self.history_budget.used,
+            "max_bytes": self.history_budget.max_bytes,
+            "set": self.set.stats(),
+            "set_reply": self.set_reply.stats(),
+            "get": self.get.stats(),
+            "get_reply": self.get_reply.stats(),
+            "raw_data": self.raw_data.stats(),
+        }
+
+    def target_pending(self, key: str) -> bool:
+        """True while the target a command set for ``key`` is not confirmed."""
+        return key in self.targets
+
+    def take_changed_keys(self) -> frozenset[str] | None:
+        """Params keys changed since the last call, None if any key may have."""
+        changed, self.__changed_keys = self.__changed_keys, set()
+        return None if changed is None else frozenset(changed)
 
     def last_received_time(self):
         return max(
@@ -63,16 +110,45 @@ class EcoflowDataHolder:
         )
 
     def add_set_message(self, msg: dict[str, Any]):
-        self.set.append(msg)
+        if not self.__handoff(self.__add_set_message, msg):
+            self.__add_set_message(msg)
 
     def add_set_reply_message(self, msg: dict[str, Any]):
+        if not self.__handoff(self.__add_set_reply_message, msg):
+            self.__add_set_reply_message(msg)
+
+    def add_get_message(self, msg: dict[str, Any]):
+        if not self.__handoff(self.__add_get_message, msg):
+            self.__add_get_message(msg)
+
+    def add_get_reply_message(self, msg: dict[str, Any]):
+        if not self.__handoff(self.__add_get_reply_message, msg):
+            self.__add_get_reply_message(msg)
+
+    def update_to_target_state(self, target_state: dict[str, Any]):
+        if not self.__handoff(self.__update_to_target_state, target_state):
+            self.__update_to_target_state(target_state)
+
+    def update_status(self, raw: dict[str, Any]):
+        if not self.__handoff(self.__update_status, raw):
+            self.__update_status(raw)
+
+    def update_data(self, raw: dict[str, Any]):
+        # None marks a data merge, so a batch can collapse consecutive merges
+        if not self.__handoff(None, raw):
+            self.__merge_params(self.__accept_data(raw))
+
+    def __add_set_message(self, msg: dict[str, Any]):
+        self.set.append(msg)
+
+    def __add_set_reply_message(self, msg: dict[str, Any]):
         self.set_reply.append(msg)
         self.set_reply_time = dt.utcnow()
 
-    def add_get_message(self, msg: dict[str, Any]):
+    def __add_get_message(self, msg: dict[str, Any]):
         self.get.append(msg)
 
-    def add_get_reply_message(self, msg: dict[str, Any]):
+    def __add_get_reply_message(self, msg: dict[str, Any]):
         try:
             result = self.extract_quota_message(msg)
         except:
@@ -84,36 +160,154 @@ class EcoflowDataHolder:
         self.get_reply.append(msg)
         self.get_reply_time = dt.utcnow()
 
-    def update_to_target_state(self, target_state: dict[str, Any]):
+    def __update_to_target_state(self, target_state: dict[str, Any]):
         # key can be xpath!
+        now = time.monotonic()
+        applied = False
         for key, value in target_state.items():
-            jp.parse(key).update(self.params, value)
+            if self.targets.apply(self.params, key, value, now):
+                self.__expression_changed(key)
+                applied = True
+        if not applied:
+            return
+        self.version += 1
 
         self.params_time = dt.utcnow()
+        self.__schedule_expire()
+        if self.target_listener is not None:
+            self.target_listener()
 
-    def update_status(self, raw: dict[str, Any]):
+    def __schedule_expire(self):
+        deadline = self.targets.next_deadline()
+        if self.__expire_timer is not None:
+            self.__expire_timer.cancel()
+            self.__expire_timer = None
+        if deadline is not None and self.__loop is not None:
+            self.__expire_timer = self.__loop.call_later(
+                max(deadline - time.monotonic(), 0), self.__expire_targets
+            )
+
+    def __expire_targets(self):
+        self.__expire_timer = None
+        expired = self.targets.expire(self.params, time.monotonic())
+        if expired:
+            for key in expired:
+                self.__expression_changed(key)
+            self.version += 1
+            self.params_time = dt.utcnow()
+            if self.target_listener is not None:
+                self.target_listener()
+        self.__schedule_expire()
+
+    def __update_status(self, raw: dict[str, Any]):
         if raw is None or "params" not in raw or "status" not in raw["params"]:
             _LOGGER.warning("No status in raw: %s", json.dumps(raw))
             return
         self.status.update({"status": int(raw["params"]["status"])})
         self.status_time = dt.utcnow()
 
-    def update_data(self, raw: dict[str, Any]):
+    def __accept_data(self, raw: dict[str, Any]) -> dict[str, Any] | None:
         if raw is not None:
             self.__add_raw_data(raw)
             try:
                 if self.module_sn is not None:
                     if "moduleSn" not in raw:
-                        return
+                        return None
                     if raw["moduleSn"] != self.module_sn:
-                        return
+                        return None
                 if "params" in raw:
-                    self.params.update(raw["params"])
-                    self.params_time = dt.utcnow()
+                    self.data_messages += 1
+                    return self.__project(raw["params"])
+
+            except Exception as error:
+                _LOGGER.error("Error updating data: %s", error)
+        return None
+
+    def __project(self, params: dict[str, Any]) -> dict[str, Any]:
+        keys = self.__projection.keys if self.__projection is not None else None
+        if keys is None or not isinstance(params, dict):
+            return params
+        return {k: v for k, v in params.items() if k in keys}
 
+    def __merge_params(self, params: dict[str, Any] | None):
+        if params is not None:
+            try:
+                current = self.params
+                changed = [
+                    key
+                    for key, value in params.items()
+                    if current.get(key, _MISSING) != value
+                ]
+                if changed:
+                    current.update(params)
+                    self.version += 1
+                    if self.__changed_keys is not None:
+                        self.__changed_keys.update(changed)
+                if self.targets:
+                    # settled keys change their pending state, maybe not the value
+                    for key in self.targets.reconcile(current, params):
+                        self.__expression_changed(key)
+                self.params_time = dt.utcnow()
+                self.params_merges += 1
             except Exception as error:
                 _LOGGER.error("Error updating data: %s", error)
 
+    def __expression_changed(self, key: str):
+        if len(key) > 1 and key[0] == key[-1] == "'":
+            # quoted flat key
+            if self.__changed_keys is not None:
+                self.__changed_keys.add(key[1:-1])
+        else:
+            self.__changed_keys = None
+
+    def __handoff(self, func: Callable[[Any], None] | None, arg: Any) -> bool:
+        if self.__loop is None or self.__in_loop():
+            return False
+        with self.__pending_lock:
+            self.__pending.append((func, arg))
+            schedule = not self.__flush_scheduled
+            self.__flush_scheduled = True
+        if schedule:
+            if self.__coalesce_window > 0:
+                self.__loop.call_soon_threadsafe(
+                    self.__loop.call_later, self.__coalesce_window, self.__flush
+                )
+            else:
+                self.__loop.call_soon_threadsafe(self.__flush)
+        return True
+
+    def __in_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.__loop
+        except RuntimeError:
+            return False
+
+    def __flush(self):
+        # everything handed off during one loop iteration is applied in one go,
+        # consecutive data messages are collapsed into a single params merge
+        with self.__pending_lock:
+            pending, self.__pending = self.__pending, []
+            self.__flush_scheduled = False
+
+        batch: dict[str, Any] | None = None
+        copied = False
+        for func, arg in pending:
+            if func is None:
+                params = self.__accept_data(arg)
+                if params is None:
+                    continue
+                if batch is None:
+                    batch, copied = params, False
+                else:
+                    if not copied:
+                        batch, copied = dict(batch), True
+                    batch.update(params)
+                continue
+            self.__merge_params(batch)
+            batch = None
+            func(arg)
+        self.__merge_params(batch)
+
     def __add_raw_data(self, raw: dict[str, Any]):
         if self.__collect_raw:
             self.raw_data.append(raw)
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import json
+import weakref
+import zlib
+from collections import deque
+from collections.abc import Iterator
+from typing import Any
+
+DEFAULT_MAX_ENTRIES = 20
+DEVICE_MAX_BYTES = 512 * 1024
+GLOBAL_MAX_BYTES = 4 * 1024 * 1024
+# entries older than the newest ones are compressed if they are this large
+COMPRESS_KEEP_NEWEST = 2
+COMPRESS_MIN_BYTES = 1024
+# estimated JSON size of a key and scalar value, e.g. "pd.wattsOutSum": 120,
+_ITEM_BYTES = 24
+
+
+class EcoflowHistoryBudget:
+    """Byte budget shared by message histories (or by other budgets).
+
+    When a budget is exceeded the oldest entries of its largest member are evicted,
+    every history keeps at least its newest entry. Like the data holders owning
+    the histories, budgets are only used on the event loop.
+    """
+
+    def __init__(
+        self, max_bytes: int, parent: EcoflowHistoryBudget | None = None
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.used = 0
+        self.__parent = parent
+        self.__members: weakref.WeakSet[EcoflowHistoryBudget | EcoflowHistory] = (
+            weakref.WeakSet()
+        )
+        if parent is not None:
+            parent.__members.add(self)
+
+    def add_member(self, member: EcoflowHistory):
+        self.__members.add(member)
+
+    def charge(self, size: int):
+        self.used += size
+        if self.__parent is not None:
+            self.__parent.charge(size)
+
+    def trim(self):
+        while self.used > self.max_bytes and self.evict_oldest():
+            pass
+        if self.__parent is not None:
+            self.__parent.trim()
+
+    def evict_oldest(self) -> bool:
+        for member in sorted(self.__members, key=lambda m: m.used, reverse=True):
+            if member.evict_oldest():
+                return True
+        return False
+
+
+_global_budget = EcoflowHistoryBudget(GLOBAL_MAX_BYTES)
+
+
+def _encode(value: Any) -> str | None:
+    try:
+        return json.dumps(value, default=str)
+    except (TypeError, ValueError):
+        # e.g. non string keys, such entries are sized by repr and not compressed
+        return None
+
+
+def _estimate(value: Any) -> int:
+    """Rough JSON size of an entry from its items and those of its children.
+
+    Cheaper than serializing, nested values are counted but not walked.
+    """
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    if not isinstance(value, (dict, list, tuple)):
+        return _ITEM_BYTES
+    size = _ITEM_BYTES
+    for item in value.values() if isinstance(value, dict) else value:
+        if isinstance(item, (str, bytes, bytearray)):
+            size += len(item) + _ITEM_BYTES
+        elif isinstance(item, (dict, list, tuple)):
+            size += (len(item) + 1) * _ITEM_BYTES
+        else:
+            size += _ITEM_BYTES
+    return size
+
+
+def device_budget(max_bytes: int = DEVICE_MAX_BYTES) -> EcoflowHistoryBudget:
+    """Budget for the histories of one device, part of the global budget."""
+    return EcoflowHistoryBudget(max_bytes, _global_budget)
+
+
+class EcoflowHistory:
+    """Newest messages of one kind, bounded in count and bytes.
+
+    Appends are O(1) and do not serialize: the newest entries are sized by an
+    estimate. Once an entry is older than the newest ones it is measured by its
+    JSON serialization, and with ``compress`` large entries are kept as compressed
+    JSON. Entries are iterated newest first, like the former list; compressed ones
+    are decoded again, so values JSON cannot hold (datetimes, bytes) come back as
+    their ``str``.
+    """
+
+    def __init__(
+        self,
+        budget: EcoflowHistoryBudget | None = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        compress: bool = True,
+    ) -> None:
+        self.__max_entries = max_entries
+        self.__compress_old = compress
+        # oldest left, newest right: [size, measured, compressed, value]
+        self.__entries = deque[list[Any]]()
+        self.__budget = budget
+        self.used = 0
+        self.evicted = 0
+        if budget is not None:
+            budget.add_member(self)
+
+    def append(self, value: Any):
+        size = _estimate(value)
+        entries = self.__entries
+        entries.append([size, False, False, value])
+        self.__charge(size)
+        if len(entries) > COMPRESS_KEEP_NEWEST:
+            self.__measure(entries[-COMPRESS_KEEP_NEWEST - 1])
+        while len(entries) > self.__max_entries:
+            self.evict_oldest()
+        if self.__budget is not None:
+            self.__budget.trim()
+
+    def evict_oldest(self) -> bool:
+        if len(self.__entries) <= 1:
+            return False
+        size = self.__entries.popleft()[0]
+        self.__charge(-size)
+        self.evicted += 1
+        return True
+
+    def __measure(self, entry: list[Any]):
+        estimate, measured, _, value = entry
+        if measured:
+            return
+        if not self.__compress_old:
+            # the estimate is kept, nothing would use the serialization
+            entry[1] = True
+            return
+        encoded = _encode(value)
+        size = len(encoded if encoded is not None else repr(value))
+        if encoded is not None and size >= COMPRESS_MIN_BYTES:
+            data = zlib.compress(encoded.encode(), 1)
+            entry[:] = [len(data), True, True, data]
+        else:
+            entry[:] = [size, True, False, value]
+        self.__charge(entry[0] - estimate)
+
+    def __charge(self, size: int):
+        self.used += size
+        if self.__budget is not None:
+            self.__budget.charge(size)
+
+    def __iter__(self) -> Iterator[Any]:
+        for _, _, compressed, value in reversed(self.__entries):
+            yield json.loads(zlib.decompress(value)) if compressed else value
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self.__entries),
+            "compressed": sum(1 for entry in self.__entries if entry[2]),
+            "bytes": self.used,
+            "evicted": self.evicted,
+        }
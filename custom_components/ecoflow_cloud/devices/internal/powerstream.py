@@ -1,11 +1,12 @@
 import logging
 from collections.abc import Sequence
-from typing import Any, cast, override
+from typing import TYPE_CHECKING, Any, cast, override
 
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.components.number import NumberEntity
 from homeassistant.components.select import SelectEntity
+from homeassistant.core import HomeAssistant
 from homeassistant.util import dt
 
 from custom_components.ecoflow_cloud.devices import const
@@ -13,12 +14,15 @@ from custom_components.ecoflow_cloud.select import PowerDictSelectEntity
 from custom_components.ecoflow_cloud.number import MaxBatteryLevelEntity, MinBatteryLevelEntity
 
 from ...devices import BaseDevice
+from ...devices.telemetry import EcoflowDecodeObservations, decode_observations
 from ...devices.internal.proto.support import (
     to_lower_camel_case,
 )
 
 from ...api import EcoflowApiClient
 from ...api.message import JSONDict
+from ...energy_statistics import EcoflowEnergyStatistics
+from ...payload_log import RateLimitedLog
 from ...sensor import (
     CelsiusSensorEntity,
     CentivoltSensorEntity,
@@ -39,20 +43,20 @@ from ...sensor import (
     StatusSensorEntity,
 )
 
-from google.protobuf.message import Message as ProtoMessageRaw
-
 from ...switch import EnabledEntity
-from ..internal.proto import platform_pb2 as platform
-from ..internal.proto import powerstream_pb2 as powerstream
 from ..internal.proto import AddressId, Command, ProtoMessage
 from .proto import PrivateAPIProtoDeviceMixin
-from .proto.support.const import WatthType, get_expected_payload_type
+from .proto.support.const import WatthType
+
+if TYPE_CHECKING:
+    from google.protobuf.message import Message as ProtoMessageRaw
 
 _LOGGER = logging.getLogger(__name__)
+_decode_log = RateLimitedLog(_LOGGER)
 
 
 def build_command(
-    device_sn: str, command: Command, payload: ProtoMessageRaw
+    device_sn: str, command: Command, payload: "ProtoMessageRaw"
 ) -> ProtoMessage:
     return ProtoMessage(
         device_sn=device_sn,
@@ -64,6 +68,23 @@ def build_command(
 
 
 class PowerStream(PrivateAPIProtoDeviceMixin, BaseDevice):
+    proto_modules = ("ecopacket_pb2", "platform_pb2", "powerstream_pb2")
+    energy_statistics: EcoflowEnergyStatistics | None = None
+
+    @override
+    def configure(self, hass: HomeAssistant):
+        super().configure(hass)
+        self.energy_statistics = EcoflowEnergyStatistics(
+            hass, self.device_data.sn, self.device_data.name
+        )
+
+    @override
+    def _record_observations(self, observations: EcoflowDecodeObservations):
+        super()._record_observations(observations)
+        if self.energy_statistics is not None:
+            for name, timestamp, watth in observations.energy:
+                self.energy_statistics.report(name, timestamp, watth)
+
     @override
     def sensors(self, client: EcoflowApiClient) -> Sequence[SensorEntity]:
         return [
@@ -243,6 +264,8 @@ class PowerStream(PrivateAPIProtoDeviceMixin, BaseDevice):
 
     @override
     def switches(self, client: EcoflowApiClient) -> Sequence[SwitchEntity]:
+        from .proto import powerstream_pb2 as powerstream
+
         return [
             EnabledEntity(
                 client,
@@ -261,6 +284,8 @@ class PowerStream(PrivateAPIProtoDeviceMixin, BaseDevice):
 
     @override
     def selects(self, client: EcoflowApiClient) -> Sequence[SelectEntity]:
+        from .proto import powerstream_pb2 as powerstream
+
         return [
             PowerDictSelectEntity(
                 client,
@@ -278,6 +303,8 @@ class PowerStream(PrivateAPIProtoDeviceMixin, BaseDevice):
 
     @override
     def numbers(self, client: EcoflowApiClient) -> Sequence[NumberEntity]:
+        from .proto import powerstream_pb2 as powerstream
+
         return [
             MaxBatteryLevelEntity(
                 client,
@@ -310,27 +337,34 @@ class PowerStream(PrivateAPIProtoDeviceMixin, BaseDevice):
     @override
     def _prepare_data(self, raw_data: bytes) -> dict[str, Any]:
         res: dict[str, Any] = {"params": {}}
-        from google.protobuf.json_format import MessageToDict
-
         from .proto import ecopacket_pb2 as ecopacket
+        from .proto import platform_pb2 as platform
         from .proto.support.const import Command, CommandFuncAndId
+        from .proto.support.extractor import command_extractor
+        from .proto.support.framing import split_frames
 
         try:
-            packet = ecopacket.SendHeaderMsg()
-            _ = packet.ParseFromString(raw_data)
-            for message in packet.msg:
-                _LOGGER.debug(
+            for frame in split_frames(raw_data):
+                message = ecopacket.Header()
+                _ = message.ParseFromString(frame)
+                self.payload_log.debug(
+                    _LOGGER,
                     'cmd_func %u, cmd_id %u, payload "%s"',
                     message.cmd_func,
                     message.cmd_id,
-                    message.pdata.hex(),
+                    message.pdata,
                 )
 
+                if message.HasField("seq"):
+                    # correlates acks with the command that caused them
+                    res["seq"] = message.seq
+
                 if (
                     message.HasField("device_sn")
                     and message.device_sn != self.device_data.sn
                 ):
-                    _LOGGER.info(
+                    _decode_log.info(
+                        self.device_data.sn,
                         "Ignoring EcoPacket for SN %s on topic for SN %s",
                         message.device_sn,
                         self.device_data.sn,
@@ -343,38 +377,37 @@ class PowerStream(PrivateAPIProtoDeviceMixin, BaseDevice):
                 try:
                     command = Command(command_desc)
                 except ValueError:
-                    _LOGGER.info(
-                        "Unsupported EcoPacket cmd_func %u, cmd_id %u",
-                        command_desc.func,
-                        command_desc.id,
+                    decode_observations(res).unknown_commands.append(
+                        (command_desc.func, command_desc.id, message.pdata)
                     )
                     continue
 
                 params = cast(JSONDict, res.setdefault("params", {}))
                 if command in {Command.PRIVATE_API_POWERSTREAM_HEARTBEAT}:
-                    payload = get_expected_payload_type(command)()
-                    _ = payload.ParseFromString(message.pdata)
-                    params.update(
-                        (f"{command.func}_{command.id}.{key}", value)
-                        for key, value in cast(
-                            JSONDict,
-                            MessageToDict(payload, preserving_proto_field_name=False),
-                        ).items()
+                    command_extractor(command).extract(
+                        message.pdata, params, self.projection.keys
                     )
                 elif command in {Command.PRIVATE_API_PLATFORM_WATTH}:
                     payload = platform.BatchEnergyTotalReport()
                     _ = payload.ParseFromString(message.pdata)
                     for watth_item in payload.watth_item:
                         try:
-                            watth_type_name = to_lower_camel_case(
-                                WatthType(watth_item.watth_type).name
-                            )
+                            watth_type = WatthType(watth_item.watth_type)
                         except ValueError:
                             continue
+                        watth_type_name = to_lower_camel_case(watth_type.name)
 
                         field_name = (
                             f"watth{watth_type_name[0].upper()}{watth_type_name[1:]}"
                         )
+                        # hourly values, the params only keep the day total
+                        decode_observations(res).energy.append(
+                            (
+                                f"watth_{watth_type.name.lower()}",
+                                watth_item.timestamp,
+                                list(watth_item.watth),
+                            )
+                        )
                         params.update(
                             {
                                 f"{command.func}_{command.id}.{field_name}": sum(
@@ -390,8 +423,13 @@ class PowerStream(PrivateAPIProtoDeviceMixin, BaseDevice):
                 res["timestamp"] = dt.utcnow()
                 continue
         except Exception as error:
-            _LOGGER.error(error)
-            _LOGGER.info(raw_data.hex())
+            _decode_log.error(
+                self.device_data.sn,
+                "Failed to decode EcoPacket from %s: %s",
+                self.device_data.sn,
+                error,
+                payload=raw_data,
+            )
         return res
 
     def _status_sensor(self, client: EcoflowApiClient) -> StatusSensorEntity:
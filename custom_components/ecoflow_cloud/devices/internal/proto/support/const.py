@@ -1,9 +1,8 @@
 import enum
-from typing import NamedTuple, cast
+from typing import TYPE_CHECKING, NamedTuple, cast
 
-from google.protobuf.message import Message as ProtoMessageRaw
-
-from .. import platform_pb2 as platform
+if TYPE_CHECKING:
+    from google.protobuf.message import Message as ProtoMessageRaw
 
 
 # https://github.com/tomvd/local-powerstream/issues/4#issuecomment-2781354316
@@ -21,7 +20,8 @@ class CommandFunc(enum.IntEnum):
     DEFAULT = 0
     SMART_PLUG = 2
     POWERSTREAM = 20
-    PLATFORM = platform.PlCmdSets.PL_EXT_CMD_SETS
+    # platform_pb2.PlCmdSets.PL_EXT_CMD_SETS, the pb2 module is loaded on demand
+    PLATFORM = 254
 
 
 class CommandFuncAndId(NamedTuple):
@@ -57,7 +57,9 @@ class Command(enum.Enum):
     )
 
     PRIVATE_API_PLATFORM_WATTH = CommandFuncAndId(
-        func=CommandFunc.PLATFORM, id=platform.PlCmdId.PL_CMD_ID_WATTH
+        # platform_pb2.PlCmdId.PL_CMD_ID_WATTH
+        func=CommandFunc.PLATFORM,
+        id=32,
     )
 
 
@@ -70,17 +72,18 @@ class WatthType(enum.IntEnum):
     PV2 = 8  # ?
 
 
-_expected_payload_types = dict[Command, type[ProtoMessageRaw]]()
+_expected_payload_types: "dict[Command, type[ProtoMessageRaw]]" = {}
 
 
-def get_expected_payload_type(cmd: Command) -> type[ProtoMessageRaw]:
+def get_expected_payload_type(cmd: Command) -> "type[ProtoMessageRaw]":
+    from .. import platform_pb2 as platform
     from .. import powerstream_pb2 as powerstream
 
     global _expected_payload_types
     if not _expected_payload_types:
         _expected_payload_types.update(
             cast(
-                dict[Command, type[ProtoMessageRaw]],
+                "dict[Command, type[ProtoMessageRaw]]",
                 {
                     Command.PRIVATE_API_POWERSTREAM_HEARTBEAT: powerstream.InverterHeartbeat,
                     Command.WN511_SET_PERMANENT_WATTS_PACK: powerstream.PermanentWattsPack,
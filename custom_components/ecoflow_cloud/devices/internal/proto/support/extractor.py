@@ -0,0 +1,86 @@
+import functools
+from typing import Any
+
+from google.protobuf.descriptor import FieldDescriptor
+from google.protobuf.message import Message as ProtoMessageRaw
+
+from .const import Command, get_expected_payload_type
+
+# values MessageToDict returns unchanged, everything else (64 bit integers as
+# strings, enum names, NaN/Infinity, bytes, nested and repeated fields) is
+# converted
+_PLAIN_CPP_TYPES = {
+    FieldDescriptor.CPPTYPE_INT32,
+    FieldDescriptor.CPPTYPE_UINT32,
+    FieldDescriptor.CPPTYPE_BOOL,
+    FieldDescriptor.CPPTYPE_STRING,
+}
+
+
+def _is_repeated(field: FieldDescriptor) -> bool:
+    # protobuf 7 replaced ``label`` with ``is_repeated``
+    is_repeated = getattr(field, "is_repeated", None)
+    if is_repeated is not None:
+        return is_repeated
+    return field.label == FieldDescriptor.LABEL_REPEATED
+
+
+def _is_plain(field: FieldDescriptor) -> bool:
+    return (
+        field.cpp_type in _PLAIN_CPP_TYPES
+        and field.type != FieldDescriptor.TYPE_BYTES
+        and not _is_repeated(field)
+    )
+
+
+class ProtoExtractor:
+    """Copies the fields set in a protobuf payload into prefixed params.
+
+    The key of every field (prefix + camelCase json name, as produced by
+    ``MessageToDict``) is computed once from the message descriptor, and only the
+    fields present in the payload are read.
+    """
+
+    def __init__(self, message_type: type[ProtoMessageRaw], prefix: str) -> None:
+        self.__message_type = message_type
+        fields = message_type.DESCRIPTOR.fields
+        self.__keys: dict[int, str] = {
+            field.number: f"{prefix}{field.json_name}" for field in fields
+        }
+        self.__all_plain = all(_is_plain(field) for field in fields)
+        self.__prefix = prefix
+
+    def extract(
+        self,
+        pdata: bytes,
+        params: dict[str, Any],
+        projection: frozenset[str] | None = None,
+    ):
+        """Extracts the payload, only the keys in ``projection`` if it is set."""
+        message = self.__message_type()
+        _ = message.ParseFromString(pdata)
+        if not self.__all_plain:
+            self.__extract_converted(message, params)
+            return
+        keys = self.__keys
+        for field, value in message.ListFields():
+            key = keys[field.number]
+            if projection is None or key in projection:
+                params[key] = value
+
+    def __extract_converted(self, message: ProtoMessageRaw, params: dict[str, Any]):
+        from google.protobuf.json_format import MessageToDict
+
+        prefix = self.__prefix
+        for key, value in MessageToDict(
+            message, preserving_proto_field_name=False
+        ).items():
+            params[f"{prefix}{key}"] = value
+
+
+@functools.cache
+def command_extractor(command: Command) -> ProtoExtractor:
+    """Extractor of the payload of a command, keys are prefixed with func_id."""
+    return ProtoExtractor(
+        get_expected_payload_type(command), f"{command.func}_{command.id}."
+    )
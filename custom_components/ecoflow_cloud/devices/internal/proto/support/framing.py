@@ -0,0 +1,65 @@
+from collections.abc import Iterator
+
+_WIRE_VARINT = 0
+_WIRE_FIXED64 = 1
+_WIRE_LENGTH_DELIMITED = 2
+_WIRE_FIXED32 = 5
+
+_MAX_VARINT_BYTES = 10
+
+
+def _read_varint(view: memoryview, pos: int, end: int) -> tuple[int, int] | None:
+    value = 0
+    for shift in range(0, 7 * _MAX_VARINT_BYTES, 7):
+        if pos >= end:
+            return None
+        byte = view[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+    return None
+
+
+def split_frames(
+    data: bytes | memoryview, field_number: int = 1
+) -> Iterator[memoryview]:
+    """Yields the embedded messages of ``field_number`` in a serialized message.
+
+    EcoPackets are sent as a serialized header message whose field 1 holds one
+    frame per occurrence (repeated or concatenated). The buffer is walked once and
+    the frames are returned as views on it, without copying. Every step moves
+    forward, so any input (truncated, garbage) terminates in linear time; walking
+    stops at the first field that is malformed or runs past the end of the buffer.
+    """
+    view = memoryview(data)
+    end = len(view)
+    pos = 0
+    while pos < end:
+        tag = _read_varint(view, pos, end)
+        if tag is None:
+            return
+        key, pos = tag
+        wire_type = key & 0x07
+        if wire_type == _WIRE_VARINT:
+            value = _read_varint(view, pos, end)
+            if value is None:
+                return
+            pos = value[1]
+        elif wire_type == _WIRE_FIXED64:
+            pos += 8
+        elif wire_type == _WIRE_FIXED32:
+            pos += 4
+        elif wire_type == _WIRE_LENGTH_DELIMITED:
+            length = _read_varint(view, pos, end)
+            if length is None:
+                return
+            size, pos = length
+            if pos + size > end:
+                return
+            if key >> 3 == field_number:
+                yield view[pos : pos + size]
+            pos += size
+        else:
+            # groups are not used by EcoPackets
+            return
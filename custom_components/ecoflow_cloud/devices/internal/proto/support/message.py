@@ -1,14 +1,16 @@
 import json
 import logging
-from typing import override
+from typing import TYPE_CHECKING, override
 
-from google.protobuf.message import Message as ProtoMessageRaw
 from paho.mqtt.client import PayloadType
 
 from .....api.message import JSONMessage, JSONType, Message
 from .....api.private_api import PrivateAPIMessageProtocol
 from .const import AddressId, Command, DirectionId, get_expected_payload_type
 
+if TYPE_CHECKING:
+    from google.protobuf.message import Message as ProtoMessageRaw
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -17,7 +19,7 @@ class ProtoMessage(PrivateAPIMessageProtocol, Message):
         self,
         *,
         command: Command | None = None,
-        payload: ProtoMessageRaw | None = None,
+        payload: "ProtoMessageRaw | None" = None,
         src: AddressId | None = None,
         dest: AddressId | None = None,
         need_ack: bool | None = True,
@@ -50,7 +52,7 @@ class ProtoMessage(PrivateAPIMessageProtocol, Message):
                 type(self.payload),
             )
 
-    def to_proto_message(self) -> ProtoMessageRaw:
+    def to_proto_message(self) -> "ProtoMessageRaw":
         from .. import ecopacket_pb2 as ecopacket
 
         packet = ecopacket.SendHeaderMsg()
@@ -76,6 +78,7 @@ class ProtoMessage(PrivateAPIMessageProtocol, Message):
             message.need_ack = self.need_ack
 
         message.seq = JSONMessage.gen_seq()
+        self.command_id = str(message.seq)
 
         return packet
 
@@ -83,6 +86,7 @@ class ProtoMessage(PrivateAPIMessageProtocol, Message):
         from google.protobuf.json_format import MessageToDict
 
         packet = JSONMessage.prepare_payload({})
+        self.command_id = str(packet["id"])
 
         if self.device_sn is not None:
             packet["sn"] = self.device_sn
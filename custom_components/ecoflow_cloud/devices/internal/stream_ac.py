@@ -5,12 +5,33 @@ from custom_components.ecoflow_cloud.entities import BaseSensorEntity, BaseNumbe
 from custom_components.ecoflow_cloud.sensor import WattsSensorEntity,LevelSensorEntity,CapacitySensorEntity, \
     InWattsSensorEntity,OutWattsSensorEntity, RemainSensorEntity, MilliVoltSensorEntity, TempSensorEntity, \
     CyclesSensorEntity, EnergySensorEntity, CumulativeCapacitySensorEntity
+from custom_components.ecoflow_cloud.devices.telemetry import decode_observations
+from custom_components.ecoflow_cloud.payload_log import LazyHex, RateLimitedLog
 from homeassistant.util import utcnow
 import logging
 
 _LOGGER = logging.getLogger(__name__)
+_decode_log = RateLimitedLog(_LOGGER)
+
+# (cmd_func, cmd_id) -> message types of the frame payload, a cmd_func of None
+# matches any function
+_FRAME_TYPES: dict[tuple[int | None, int], tuple[str, ...]] = {
+    (None, 21): ("Champ_cmd21_3",),
+    (None, 50): ("Champ_cmd50_3",),
+}
+# frames of other commands (e.g. cmd 22) are parsed as every known message type,
+# like before the dispatch table, and counted in the unknown command telemetry
+_FALLBACK_TYPES = (
+    "HeaderStream",
+    "Champ_cmd21",
+    "Champ_cmd21_3",
+    "Champ_cmd50",
+    "Champ_cmd50_3",
+)
 
 class StreamAC(BaseDevice):
+    proto_modules = ("stream_ac_pb2",)
+
     def sensors(self, client: EcoflowApiClient) -> list[BaseSensorEntity]:
         return [
             # "accuChgCap": 198511,
@@ -274,76 +295,46 @@ class StreamAC(BaseDevice):
 
     def _prepare_data(self, raw_data) -> dict[str, any]:
         raw = {"params": {}}
-        from .proto import ecopacket_pb2 as ecopacket, stream_ac_pb2 as stream_ac, stream_ac_pb2 as stream_ac2
+        from .proto import stream_ac_pb2 as stream_ac
+        from .proto.support.framing import split_frames
         try:
-            payload =raw_data
-
-            while True:
-                _LOGGER.debug("payload \"%s\"", payload.hex())
-                packet = stream_ac.SendHeaderStreamMsg()
-                packet.ParseFromString(payload)
-
-                if hasattr(packet.msg, "pdata") :
-                    _LOGGER.debug("cmd id \"%u\" fct id \"%u\" content \"%s\" - pdata:\"%s\"", packet.msg.cmd_id, packet.msg.cmd_func, str(packet), str(packet.msg.pdata.hex()))
-                else :
-                    _LOGGER.debug("cmd id \"%u\" fct id \"%u\" content \"%s\"", packet.msg.cmd_id, str(packet))
-
-                if packet.msg.cmd_id < 0: #packet.msg.cmd_id != 21 and packet.msg.cmd_id != 22 and packet.msg.cmd_id != 50:
-                    _LOGGER.info("Unsupported EcoPacket cmd id %u", packet.msg.cmd_id)
-
-                else:
-                    _LOGGER.debug("new payload \"%s\"",str(packet.msg.pdata.hex()))
-                    # paquet HeaderStream
-                    if packet.msg.cmd_id > 0:
-                        self._parsedata(packet, stream_ac2.HeaderStream(), raw)
-
-                    # paquet Champ_cmd21
-                    if packet.msg.cmd_id > 0:
-                        self._parsedata(packet, stream_ac2.Champ_cmd21(), raw)
-
-                    # paquet Champ_cmd21_3
-                    if packet.msg.cmd_id > 0:
-                        self._parsedata(packet, stream_ac2.Champ_cmd21_3(), raw)
-
-                    # paquet Champ_cmd50
-                    if packet.msg.cmd_id > 0:
-                        self._parsedata(packet, stream_ac2.Champ_cmd50(), raw)
+            for frame in split_frames(raw_data):
+                msg = stream_ac.HeaderStream()
+                msg.ParseFromString(frame)
+                self.payload_log.debug(_LOGGER, "cmd id \"%u\" fct id \"%u\" - pdata:\"%s\"", msg.cmd_id, msg.cmd_func, msg.pdata)
 
-                    # paquet Champ_cmd50_3
-                    if packet.msg.cmd_id > 0:
-                        self._parsedata(packet, stream_ac2.Champ_cmd50_3(), raw)
-
-                    _LOGGER.info("Found %u fields", len(raw["params"]))
-
-                    raw["timestamp"] = utcnow()
-
-                if packet.ByteSize() >= len(payload):
-                    break
-
-                _LOGGER.info("Found another frame in payload")
-
-                packet_length = len(payload) - packet.ByteSize()
-                payload = payload[:packet_length]
+                self._parse_frame(msg, raw)
+                _LOGGER.debug("Found %u fields", len(raw["params"]))
+                raw["timestamp"] = utcnow()
 
         except Exception as error:
-            _LOGGER.error(error)
-            _LOGGER.debug("raw_data : \"%s\"  raw_data.hex() : \"%s\"",str(raw_data),str(raw_data.hex()))
+            _decode_log.error(self.device_data.sn, "Failed to decode EcoPacket from %s: %s", self.device_data.sn, error, payload=raw_data)
         return raw
 
-    def _parsedata(self, packet, content, raw) :
-        try:
-            if hasattr(packet.msg, "pdata") and len(packet.msg.pdata) > 0 :
-                content.ParseFromString(packet.msg.pdata)
-
-                if len(str(content)) > 0:
-                    _LOGGER.debug("initial cmd id \"%u\" fct id \"%u\" msg \n\"%s\"", packet.msg.cmd_id, packet.msg.cmd_func, str(content))
+    def _parse_frame(self, msg, raw):
+        from .proto import stream_ac_pb2 as stream_ac
 
-                for descriptor in content.DESCRIPTOR.fields:
-                    if not content.HasField(descriptor.name):
-                        continue
+        key = (msg.cmd_func, msg.cmd_id)
+        type_names = _FRAME_TYPES.get(key) or _FRAME_TYPES.get((None, msg.cmd_id))
+        if type_names is None:
+            # frames without a command id (heartbeats) never carried data
+            if msg.cmd_id <= 0:
+                return
+            decode_observations(raw).unknown_commands.append((*key, msg.pdata))
+            type_names = _FALLBACK_TYPES
 
-                    raw["params"][descriptor.name] = getattr(content, descriptor.name)
+        if len(msg.pdata) == 0:
+            return
+        for type_name in type_names:
+            content = getattr(stream_ac, type_name)()
+            try:
+                content.ParseFromString(msg.pdata)
+            except Exception as error:
+                _LOGGER.debug("Erreur parsing pour le flux : %s (%s)", LazyHex(msg.pdata), error)
+                continue
 
-        except Exception as error:
-            _LOGGER.debug(error)
-            _LOGGER.debug("Erreur parsing pour le flux : %s",str(packet.msg.pdata.hex()))
\ No newline at end of file
+            self.payload_log.debug(_LOGGER, "cmd id \"%u\" fct id \"%u\" msg \n\"%s\"", msg.cmd_id, msg.cmd_func, content)
+            keys = self.projection.keys
+            for field, value in content.ListFields():
+                if keys is None or field.name in keys:
+                    raw["params"][field.name] = value
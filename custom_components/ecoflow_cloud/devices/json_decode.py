@@ -0,0 +1,65 @@
+import json
+import logging
+from typing import Any
+
+from ..payload_log import RateLimitedLog
+
+_LOGGER = logging.getLogger(__name__)
+
+try:
+    # shipped with Home Assistant, the stdlib parser is the fallback
+    import orjson
+
+    _loads = orjson.loads
+    _errors: tuple[type[Exception], ...] = (orjson.JSONDecodeError, ValueError)
+    JSON_BACKEND = "orjson"
+except ImportError:
+    _loads = json.loads
+    _errors = (ValueError,)
+    JSON_BACKEND = "json"
+
+_errors_log = RateLimitedLog(_LOGGER)
+
+
+def _invalid_utf8(error: Exception) -> bool:
+    # the stdlib parser raises UnicodeDecodeError, orjson a JSONDecodeError
+    return isinstance(error, UnicodeDecodeError) or "UTF-8" in str(error)
+
+
+def _stdlib_may_parse(error: Exception) -> bool:
+    # NaN, Infinity and a BOM are accepted by the stdlib parser, for orjson they
+    # are unexpected characters
+    return JSON_BACKEND == "orjson" and getattr(error, "msg", "").startswith(
+        "unexpected character"
+    )
+
+
+def decode_json(raw_data: bytes, source: str, strict: bool = False) -> dict[str, Any]:
+    """Parse a JSON payload straight from bytes, returns {} if it is invalid.
+
+    In lenient mode a payload that is not valid UTF-8 is parsed a second time with
+    the invalid bytes dropped. Payloads only the stdlib parser accepts (NaN,
+    Infinity) are parsed by it. Errors are logged rate limited per source.
+    """
+    try:
+        return _loads(raw_data)
+    except _errors as error:
+        retry: bytes | str | None = None
+        if _invalid_utf8(error):
+            if not strict and isinstance(raw_data, (bytes, bytearray)):
+                retry = raw_data.decode("utf-8", errors="ignore")
+        elif _stdlib_may_parse(error):
+            retry = raw_data
+        if retry is not None:
+            try:
+                return json.loads(retry)
+            except ValueError:
+                pass
+        _errors_log.error(
+            source,
+            "Invalid JSON from %s: %s. Ignoring message and waiting for the next one",
+            source,
+            error,
+            payload=raw_data,
+        )
+        return {}
@@ -0,0 +1,123 @@
+import functools
+import re
+from collections.abc import Callable
+from typing import Any
+
+# returned by accessors when the path does not match
+MISSING: Any = object()
+
+# the expressions used by the devices: a quoted key (flat json), dotted names
+# (nested json) and list indexes, e.g. 'pd.wattsOutSum', pd.wattsOutSum or
+# 'wattInfo.chWatt'[2]
+_FIELD = r"(?:'(?P<quoted>[^'\\]*)'|(?P<name>[A-Za-z_@][A-Za-z0-9_@\-]*))"
+_SEGMENT = re.compile(_FIELD + r"(?P<indexes>(?:\[\d+\])*)")
+_INDEX = re.compile(r"\[(\d+)\]")
+
+type KeyPathGetter = Callable[[Any], Any]
+type KeyPathSetter = Callable[[Any, Any], bool]
+
+
+def _parse(expression: str) -> list[str | int] | None:
+    steps = list[str | int]()
+    pos = 0
+    while True:
+        match = _SEGMENT.match(expression, pos)
+        if match is None:
+            return None
+        quoted = match.group("quoted")
+        steps.append(quoted if quoted is not None else match.group("name"))
+        steps.extend(int(index) for index in _INDEX.findall(match.group("indexes")))
+        pos = match.end()
+        if pos == len(expression):
+            return steps
+        if expression[pos] != ".":
+            return None
+        pos += 1
+
+
+def _jsonpath_getter(expression: str) -> KeyPathGetter:
+    import jsonpath_ng.ext as jp
+
+    parsed = jp.parse(expression)
+
+    def get(data: Any) -> Any:
+        values = parsed.find(data)
+        return values[0].value if len(values) == 1 else MISSING
+
+    return get
+
+
+def _jsonpath_setter(expression: str) -> KeyPathSetter:
+    import jsonpath_ng.ext as jp
+
+    parsed = jp.parse(expression)
+
+    def set_value(data: Any, value: Any) -> bool:
+        parsed.update(data, value)
+        return len(parsed.find(data)) > 0
+
+    return set_value
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_key_path(expression: str) -> KeyPathGetter:
+    """Accessor of the value at ``expression`` in params, MISSING if absent.
+
+    Matches what a jsonpath ``find`` with exactly one result returns, expressions
+    other than the supported shapes are evaluated by jsonpath_ng.
+    """
+    steps = _parse(expression)
+    if steps is None:
+        return _jsonpath_getter(expression)
+
+    if len(steps) == 1:
+        key = steps[0]
+
+        def get_key(data: Any) -> Any:
+            if isinstance(data, dict):
+                return data.get(key, MISSING)
+            return MISSING
+
+        return get_key
+
+    return functools.partial(_walk, steps=steps)
+
+
+def _walk(data: Any, steps: list[str | int]) -> Any:
+    for step in steps:
+        if isinstance(step, int):
+            if not isinstance(data, (list, str)) or step >= len(data):
+                return MISSING
+            data = data[step]
+        elif isinstance(data, dict):
+            data = data.get(step, MISSING)
+            if data is MISSING:
+                return MISSING
+        else:
+            return MISSING
+    return data
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_key_setter(expression: str) -> KeyPathSetter:
+    """Setter of the value at ``expression`` in params, like a jsonpath ``update``.
+
+    Only existing values are replaced, the setter returns False if there is none.
+    """
+    steps = _parse(expression)
+    if steps is None:
+        return _jsonpath_setter(expression)
+
+    *parents, last = steps
+
+    def set_value(data: Any, value: Any) -> bool:
+        container = _walk(data, parents)
+        if isinstance(last, int):
+            if not isinstance(container, list) or last >= len(container):
+                return False
+        elif not isinstance(container, dict) or last not in container:
+            return False
+        container[last] = value
+        return True
+
+    return set_value
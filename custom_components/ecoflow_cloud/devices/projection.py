@@ -0,0 +1,99 @@
+import contextlib
+import threading
+from collections.abc import Iterable, Iterator
+
+
+class EcoflowKeyProjection:
+    """Params keys read by the entities of a device that are in Home Assistant.
+
+    Decoders and the data holder skip every other key. ``keys`` is None (nothing
+    is skipped) until the platforms are set up and ``activate`` was called, and
+    for devices that need all keys (diagnostic mode, nested json, entities whose
+    keys cannot be determined). The set is replaced on change, so decoder threads
+    read it without a lock.
+    """
+
+    def __init__(self, enabled: bool) -> None:
+        self.__lock = threading.Lock()
+        self.__enabled = enabled
+        self.__active = False
+        # set while the current thread decodes a payload completely
+        self.__local = threading.local()
+        self.__refs = dict[str, int]()
+        self.__keys: frozenset[str] | None = None
+
+    @property
+    def keys(self) -> frozenset[str] | None:
+        if getattr(self.__local, "bypassed", False):
+            return None
+        return self.__keys
+
+    def add(self, keys: Iterable[str] | None):
+        if keys is None:
+            self.disable()
+            return
+        with self.__lock:
+            for key in keys:
+                self.__refs[key] = self.__refs.get(key, 0) + 1
+            self.__publish()
+
+    def remove(self, keys: Iterable[str] | None):
+        with self.__lock:
+            for key in keys or ():
+                count = self.__refs.get(key, 0) - 1
+                if count > 0:
+                    self.__refs[key] = count
+                else:
+                    self.__refs.pop(key, None)
+            self.__publish()
+
+    def activate(self):
+        with self.__lock:
+            self.__active = True
+            self.__publish()
+
+    def disable(self):
+        with self.__lock:
+            self.__enabled = False
+            self.__publish()
+
+    @contextlib.contextmanager
+    def bypassed(self) -> Iterator[None]:
+        """Decodes everything in this thread while the block runs.
+
+        Only the payload decoded in the block is complete (unknown key telemetry),
+        decoders of other payloads in other threads keep skipping keys.
+        """
+        previous = getattr(self.__local, "bypassed", False)
+        self.__local.bypassed = True
+        try:
+            yield
+        finally:
+            self.__local.bypassed = previous
+
+    def __publish(self):
+        if self.__enabled and self.__active:
+            self.__keys = frozenset(self.__refs)
+        else:
+            self.__keys = None
+
+
+class KeyRecorder(dict):
+    """Empty params that remember which keys a command lambda reads."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.read_keys = set[str]()
+
+    def __missing__(self, key: str):
+        self.read_keys.add(key)
+        return 0
+
+    def get(self, key: str, default=None):
+        self.read_keys.add(key)
+        return default
+
+    def __contains__(self, key: object) -> bool:
+        if isinstance(key, str):
+            self.read_keys.add(key)
+        return False
@@ -1,4 +1,5 @@
 import logging
+from typing import Any
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -16,6 +17,9 @@ plain_to_status: dict[str, str] = {
 
 status_to_plain = dict((v, k) for (k, v) in plain_to_status.items())
 
+_MAX_PREFIXES = 256
+_MAX_PROJECTIONS = 64
+
 
 def to_plain(raw_data: dict[str, any]) -> dict[str, any]:
     new_params = {}
@@ -74,3 +78,100 @@ def to_plain(raw_data: dict[str, any]) -> dict[str, any]:
     _LOGGER.debug(str(result))
 
     return result
+
+
+class PlainFlattener:
+    """Compiled ``to_plain`` for one device type.
+
+    The prefix of every typeCode (or cmdFunc/cmdId) the device sends is resolved
+    once, and the flat params are built in a single pass over the payload. The
+    output is the same as the one of ``to_plain``. With projected ``keys`` the
+    payload keys that no wanted key starts with are not copied at all.
+    """
+
+    def __init__(self) -> None:
+        self.__prefixes: dict[Any, str] = {}
+        # projected keys -> prefix -> wanted unprefixed payload keys; a flattener
+        # is shared by the devices of a type, each with its own projection
+        self.__wanted: dict[frozenset[str], dict[str, frozenset[str]]] = {}
+
+    def __call__(
+        self, raw_data: dict[str, Any], keys: frozenset[str] | None = None
+    ) -> dict[str, Any]:
+        prefix = self.__prefix(raw_data)
+        wanted = None if keys is None else self.__wanted_keys(prefix, keys)
+        params: dict[str, Any] = {}
+        for source, skip_nested in (
+            (raw_data.get("param"), False),
+            (raw_data.get("params"), False),
+            (raw_data, True),
+        ):
+            if source is None:
+                continue
+            for k, v in source.items():
+                if skip_nested and (k == "param" or k == "params"):
+                    continue
+                if wanted is not None and k not in wanted:
+                    if "." in k and f"{prefix}{k}" in params:
+                        # a flat key overrides the nested value copied before it
+                        return to_plain(raw_data)
+                    continue
+                key = f"{prefix}{k}"
+                if key in params:
+                    # a repeated key changes which nested values win, rare enough
+                    # to leave it to the reference implementation
+                    return to_plain(raw_data)
+                params[key] = v
+                if isinstance(v, dict):
+                    for k2, v2 in v.items():
+                        params[f"{key}.{k2}"] = v2
+
+        result: dict[str, Any] = {"params": params, "raw_data": raw_data}
+        # metadata the data holder relies on, see to_plain
+        if "moduleSn" in raw_data:
+            result["moduleSn"] = raw_data["moduleSn"]
+        if "sn" in raw_data:
+            result["sn"] = raw_data["sn"]
+        if "time" in raw_data:
+            result["time"] = raw_data["time"]
+        _LOGGER.debug("%s", result)
+        return result
+
+    def __wanted_keys(self, prefix: str, keys: frozenset[str]) -> frozenset[str]:
+        by_prefix = self.__wanted.get(keys)
+        if by_prefix is None:
+            if len(self.__wanted) >= _MAX_PROJECTIONS:
+                # projections are replaced when entities change, drop the oldest
+                self.__wanted.pop(next(iter(self.__wanted), None), None)
+            by_prefix = self.__wanted[keys] = {}
+        cached = by_prefix.get(prefix)
+        if cached is not None:
+            return cached
+        # a payload key is wanted if it or one of its nested values is projected
+        wanted = set[str]()
+        for key in keys:
+            if key.startswith(prefix):
+                parts = key[len(prefix) :].split(".")
+                wanted.update(".".join(parts[: i + 1]) for i in range(len(parts)))
+        result = frozenset(wanted)
+        if len(by_prefix) < _MAX_PREFIXES:
+            by_prefix[prefix] = result
+        return result
+
+    def __prefix(self, raw_data: dict[str, Any]) -> str:
+        if "typeCode" in raw_data:
+            key = raw_data["typeCode"]
+        elif "cmdFunc" in raw_data and "cmdId" in raw_data:
+            key = (raw_data["cmdFunc"], raw_data["cmdId"])
+        else:
+            return ""
+
+        prefix = self.__prefixes.get(key)
+        if prefix is None:
+            if isinstance(key, tuple):
+                prefix = f"{key[0]}_{key[1]}."
+            else:
+                prefix = f"{status_to_plain.get(key, 'unknown_' + key)}."
+            if len(self.__prefixes) < _MAX_PREFIXES:
+                self.__prefixes[key] = prefix
+        return prefix
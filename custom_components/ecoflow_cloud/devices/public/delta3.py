@@ -1,14 +1,16 @@
 from ...api import EcoflowApiClient
 from ...sensor import StatusSensorEntity
 from ..internal.delta3 import Delta3 as InternalDelta3
-from .data_bridge import to_plain
+from .data_bridge import PlainFlattener
+
+_to_plain = PlainFlattener()
 
 
 class Delta3(InternalDelta3):
 
     def _prepare_data(self, raw_data) -> dict[str, any]:
         res = super()._prepare_data(raw_data)
-        res = to_plain(res)
+        res = _to_plain(res, self.projection.keys)
         return res
 
     def _status_sensor(self, client: EcoflowApiClient) -> StatusSensorEntity:
@@ -1,14 +1,16 @@
 from ...api import EcoflowApiClient
 from ...sensor import StatusSensorEntity
 from ..internal.delta_max import DeltaMax as InternalDeltaMax
-from .data_bridge import to_plain
+from .data_bridge import PlainFlattener
+
+_to_plain = PlainFlattener()
 
 
 class DeltaMax(InternalDeltaMax):
 
     def _prepare_data(self, raw_data) -> dict[str, any]:
         res = super()._prepare_data(raw_data)
-        res = to_plain(res)
+        res = _to_plain(res, self.projection.keys)
         return res
 
     def _status_sensor(self, client: EcoflowApiClient) -> StatusSensorEntity:
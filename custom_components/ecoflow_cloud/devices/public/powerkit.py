@@ -37,7 +37,6 @@ class PowerKit(BaseDevice):
     def __init__(self, device_info: EcoflowDeviceInfo, device_data: DeviceData) -> None:
         self.dcSwitchFunction: Callable[[str, int], dict[str, Any]] = (
             lambda sn, value: {
-                "id": 123456789,
                 "version": "1.0",
                 "moduleSn": sn,
                 "moduleType": 15362,
@@ -725,7 +724,6 @@ class PowerKit(BaseDevice):
                     0,
                     16,  # This is not the real limit of the powerkit, but because it has a normal 230V plug, we don't allow here to go over 16A because you will maybe frie your socket
                     lambda value: {
-                        "id": 123456789,
                         "version": "1.0",
                         "sn": self.device_data.parent.sn,
                         "moduleSn": self.device_data.sn,
@@ -791,7 +789,6 @@ class PowerKit(BaseDevice):
                     "passByModeEn",
                     "Prioretize grid",
                     lambda value: {
-                        "id": 123456789,
                         "version": "1.0",
                         "moduleSn": self.device_data.sn,
                         "moduleType": 15365,
@@ -815,7 +812,6 @@ class PowerKit(BaseDevice):
                     "invSwSta",
                     "AC Output",
                     lambda value: {
-                        "id": 123456789,
                         "version": "1.0",
                         "moduleSn": self.device_data.sn,
                         "moduleType": 15365,
@@ -836,7 +832,6 @@ class PowerKit(BaseDevice):
                     # That is the good button!
                     "AC Charging",
                     lambda value: {
-                        "id": 123456789,
                         "version": "1.0",
                         "moduleSn": self.device_data.sn,
                         "moduleType": 15365,
@@ -864,7 +859,6 @@ class PowerKit(BaseDevice):
                     "not_existing",  # we want to use dcOutSta here but it is again on another device (bbcout)
                     "Main DC Output",
                     lambda value: {
-                        "id": 123456789,
                         "version": "1.0",
                         "moduleSn": self.device_data.sn,
                         "moduleType": 15362,
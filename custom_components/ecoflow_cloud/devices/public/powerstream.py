@@ -31,10 +31,12 @@ from ...sensor import (
     StatusSensorEntity,
 )
 from .. import BaseDevice, const
-from .data_bridge import to_plain
+from .data_bridge import PlainFlattener
 
 _LOGGER = logging.getLogger(__name__)
 
+_to_plain = PlainFlattener()
+
 
 class PowerStream(BaseDevice):
     def sensors(self, client: EcoflowApiClient) -> Sequence[SensorEntity]:
@@ -268,7 +270,7 @@ class PowerStream(BaseDevice):
     @override
     def _prepare_data(self, raw_data: bytes) -> dict[str, Any]:
         res = super()._prepare_data(raw_data)
-        res = to_plain(res)
+        res = _to_plain(res, self.projection.keys)
         return res
 
     def _status_sensor(self, client: EcoflowApiClient) -> StatusSensorEntity:
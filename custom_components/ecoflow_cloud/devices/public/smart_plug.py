@@ -13,7 +13,9 @@ from ...sensor import (
 )
 from ...switch import EnabledEntity
 from .. import BaseDevice, const
-from .data_bridge import to_plain
+from .data_bridge import PlainFlattener
+
+_to_plain = PlainFlattener()
 
 
 class SmartPlug(BaseDevice):
@@ -64,6 +66,6 @@ class SmartPlug(BaseDevice):
 
     def _prepare_data(self, raw_data) -> dict[str, any]:
         res = super()._prepare_data(raw_data)
-        res = to_plain(res)
+        res = _to_plain(res, self.projection.keys)
 
         return res
@@ -1,6 +1,6 @@
 from ...api import EcoflowApiClient
 from ...sensor import StatusSensorEntity
-from .data_bridge import to_plain
+from .data_bridge import PlainFlattener
 from custom_components.ecoflow_cloud.api import EcoflowApiClient
 from custom_components.ecoflow_cloud.devices import const, BaseDevice
 from custom_components.ecoflow_cloud.entities import BaseSensorEntity, BaseNumberEntity, BaseSwitchEntity, \
@@ -9,6 +9,9 @@ from custom_components.ecoflow_cloud.sensor import WattsSensorEntity,LevelSensor
     InWattsSensorEntity,OutWattsSensorEntity, RemainSensorEntity, MilliVoltSensorEntity, TempSensorEntity, \
     CyclesSensorEntity, EnergySensorEntity, CumulativeCapacitySensorEntity
 
+_to_plain = PlainFlattener()
+
+
 class StreamAC(BaseDevice):
 
     def sensors(self, client: EcoflowApiClient) -> list[BaseSensorEntity]:
@@ -271,7 +274,7 @@ class StreamAC(BaseDevice):
 
     def _prepare_data(self, raw_data) -> dict[str, any]:
         res = super()._prepare_data(raw_data)
-        res = to_plain(res)
+        res = _to_plain(res, self.projection.keys)
         return res
 
     def _status_sensor(self, client: EcoflowApiClient) -> StatusSensorEntity:
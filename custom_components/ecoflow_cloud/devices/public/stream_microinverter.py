@@ -14,7 +14,9 @@ from ...sensor import (
     FrequencySensorEntity,
 )
 from .. import BaseDevice, const
-from .data_bridge import to_plain
+from .data_bridge import PlainFlattener
+
+_to_plain = PlainFlattener()
 
 
 class StreamMicroinveter(BaseDevice):
@@ -50,7 +52,7 @@ class StreamMicroinveter(BaseDevice):
 
     def _prepare_data(self, raw_data) -> dict[str, any]:
         res = super()._prepare_data(raw_data)
-        res = to_plain(res)
+        res = _to_plain(res, self.projection.keys)
         return res
 
     def _status_sensor(self, client: EcoflowApiClient) -> StatusSensorEntity:
@@ -0,0 +1,111 @@
+import dataclasses
+from typing import Any
+
+from .key_path import (
+    MISSING,
+    KeyPathGetter,
+    KeyPathSetter,
+    compile_key_path,
+    compile_key_setter,
+)
+
+DEFAULT_TARGET_TIMEOUT = 15.0
+
+
+@dataclasses.dataclass
+class _PendingTarget:
+    get: KeyPathGetter
+    set: KeyPathSetter
+    target: Any
+    # last value reported by the device, restored when the target times out
+    previous: Any
+    deadline: float
+
+
+class EcoflowTargetState:
+    """Values written to params by commands that the device did not confirm yet.
+
+    A target is shown right away and stays pending until device data reports it
+    (confirmed) or reports a value other than the one before the command (the
+    device decided otherwise, its value is kept). Data still carrying the previous
+    value is older than the command, the target is written back over it. Targets
+    without an answer within ``timeout`` seconds are rolled back to the previous
+    value. Like the data holder, only used on the event loop.
+    """
+
+    def __init__(self, timeout: float = DEFAULT_TARGET_TIMEOUT) -> None:
+        self.timeout = timeout
+        # key expression -> pending target
+        self.__pending: dict[str, _PendingTarget] = {}
+        self.applied = 0
+        self.confirmed = 0
+        self.overridden = 0
+        self.rolled_back = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.__pending)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__pending
+
+    def next_deadline(self) -> float | None:
+        return min((p.deadline for p in self.__pending.values()), default=None)
+
+    def apply(self, params: dict[str, Any], key: str, value: Any, now: float) -> bool:
+        """Writes a target into params, False if params have no value for key."""
+        pending = self.__pending.get(key)
+        if pending is None:
+            get = compile_key_path(key)
+            previous = get(params)
+            if previous is MISSING:
+                return False
+            pending = _PendingTarget(
+                get, compile_key_setter(key), value, previous, now + self.timeout
+            )
+        else:
+            # a newer command for a pending key, the device value is unchanged
+            pending.target = value
+            pending.deadline = now + self.timeout
+        if not pending.set(params, value):
+            self.__pending.pop(key, None)
+            return False
+        self.__pending[key] = pending
+        self.applied += 1
+        return True
+
+    def reconcile(self, params: dict[str, Any], reported: dict[str, Any]) -> list[str]:
+        """Settles targets with data merged into params, returns the settled keys."""
+        settled = list[str]()
+        for key, pending in list(self.__pending.items()):
+            value = pending.get(reported)
+            if value is MISSING:
+                continue
+            if value == pending.target:
+                self.confirmed += 1
+            elif value != pending.previous:
+                self.overridden += 1
+            else:
+                pending.set(params, pending.target)
+                continue
+            del self.__pending[key]
+            settled.append(key)
+        return settled
+
+    def expire(self, params: dict[str, Any], now: float) -> list[str]:
+        """Rolls back the targets past their deadline, returns their keys."""
+        expired = [k for k, p in self.__pending.items() if p.deadline <= now]
+        for key in expired:
+            pending = self.__pending.pop(key)
+            pending.set(params, pending.previous)
+        self.rolled_back += len(expired)
+        return expired
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "timeout": self.timeout,
+            "pending": list(self.__pending),
+            "applied": self.applied,
+            "confirmed": self.confirmed,
+            "overridden": self.overridden,
+            "rolled_back": self.rolled_back,
+        }
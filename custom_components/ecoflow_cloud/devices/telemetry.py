@@ -0,0 +1,122 @@
+import dataclasses
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any
+
+from ..payload_log import LazyHex
+
+DEFAULT_MAX_ENTRIES = 64
+KEY_SAMPLE_EVERY = 100
+_SAMPLE_LENGTH = 128
+# key of a decoded message holding its observations, removed before it is applied
+OBSERVATIONS_KEY = "__ecoflow_observations"
+
+
+@dataclasses.dataclass
+class EcoflowDecodeObservations:
+    """What decoding one payload saw besides the message itself.
+
+    Decoders may run in a worker process (``process_decode``) on a copy of the
+    device, so they do not record anything on the device. They return their
+    observations with the decoded message instead, the ingest queue hands them to
+    ``BaseDevice.record_decode`` in Home Assistant's process.
+    """
+
+    # (name, timestamp, watt hours per hour of the day)
+    energy: list[tuple[str, int, list[int]]] = dataclasses.field(
+        default_factory=list
+    )
+    # (cmd_func, cmd_id, payload) of frames without a decoder
+    unknown_commands: list[tuple[int, int, bytes]] = dataclasses.field(
+        default_factory=list
+    )
+
+
+def decode_observations(res: dict[str, Any]) -> EcoflowDecodeObservations:
+    """Observations of the message being decoded into ``res``."""
+    observations = res.get(OBSERVATIONS_KEY)
+    if observations is None:
+        observations = res[OBSERVATIONS_KEY] = EcoflowDecodeObservations()
+    return observations
+
+
+class _LruCounter:
+    """Occurrence counts with the first sample, the least recent entry is evicted."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.__max_entries = max_entries
+        self.__entries = OrderedDict[Any, list[Any]]()
+        self.evicted = 0
+
+    def count(self, key: Any, sample: Any) -> bool:
+        """Counts ``key``, returns True if it was not counted before."""
+        entry = self.__entries.get(key)
+        if entry is not None:
+            entry[0] += 1
+            self.__entries.move_to_end(key)
+            return False
+        self.__entries[key] = [1, str(sample)[:_SAMPLE_LENGTH]]
+        if len(self.__entries) > self.__max_entries:
+            self.__entries.popitem(last=False)
+            self.evicted += 1
+        return True
+
+    def as_dict(self, key_format=str) -> dict[str, Any]:
+        return {
+            key_format(key): {"count": count, "sample": sample}
+            for key, (count, sample) in self.__entries.items()
+        }
+
+
+class EcoflowUnknownTelemetry:
+    """Bounded counters of what a device sends that the integration does not use.
+
+    Unknown commands are (cmd_func, cmd_id) pairs without a decoder, unknown keys
+    are params keys no entity of the device reads. Both keep the first payload or
+    value seen as sample. Keys are checked on one data message in
+    ``KEY_SAMPLE_EVERY`` (the first one included), once the entities registered
+    the keys they read.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.__lock = threading.Lock()
+        self.__commands = _LruCounter(max_entries)
+        self.__keys = _LruCounter(max_entries)
+        self.__known = set[str]()
+        self.__messages = 0
+
+    def add_known_keys(self, keys: Iterable[str]):
+        with self.__lock:
+            self.__known.update(keys)
+
+    def sample_keys(self) -> bool:
+        """True if the keys of the current data message should be checked."""
+        if not self.__known:
+            return False
+        self.__messages += 1
+        if self.__messages >= KEY_SAMPLE_EVERY:
+            self.__messages = 0
+        return self.__messages == 1
+
+    def unknown_command(self, cmd_func: int, cmd_id: int, payload: bytes) -> bool:
+        """Counts a command, returns True the first time it is seen."""
+        with self.__lock:
+            return self.__commands.count((cmd_func, cmd_id), LazyHex(payload))
+
+    def observe_params(self, params: Any):
+        if not isinstance(params, dict):
+            return
+        with self.__lock:
+            unknown = params.keys() - self.__known
+            for key in unknown:
+                self.__keys.count(key, repr(params[key]))
+
+    def as_dict(self) -> dict[str, Any]:
+        with self.__lock:
+            return {
+                "commands": self.__commands.as_dict(lambda key: "%s_%s" % key),
+                "commands_evicted": self.__commands.evicted,
+                "keys": self.__keys.as_dict(),
+                "keys_evicted": self.__keys.evicted,
+            }
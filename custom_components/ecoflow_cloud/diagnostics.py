@@ -29,7 +29,18 @@ async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigE
             'set_reply': [dict(sorted(k.items())) for k in device.data.set_reply],
             'get':       [dict(sorted(k.items())) for k in device.data.get],
             'get_reply': [dict(sorted(k.items())) for k in device.data.get_reply],
-            'raw_data': device.data.raw_data,
+            'raw_data': list(device.data.raw_data),
+            'history':   device.data.history_stats(),
+            'merge_stats': device.data.merge_stats(),
+            'targets':   device.data.targets.stats(),
+            'commands':  device.command_tracker.stats(),
+            'unknown':   device.telemetry.as_dict(),
         }
         values["EcoFlow"].append(value)
+    if client.ingest is not None:
+        values["ingest"] = client.ingest.stats()
+    if client.commands is not None:
+        values["commands"] = client.commands.stats()
+    if client.mqtt_client is not None:
+        values["reconnect"] = client.mqtt_client.reconnect_stats()
     return values
@@ -0,0 +1,175 @@
+import asyncio
+import datetime
+import logging
+import threading
+
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt
+
+from . import ECOFLOW_DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+_HOUR = datetime.timedelta(hours=1)
+# how far back the sum before a day is searched when newer rows exist
+_BASELINE_LOOKBACK = datetime.timedelta(days=31)
+
+
+class EcoflowEnergyStatistics:
+    """Imports the hourly energy arrays reported by a device as statistics.
+
+    Devices report one energy value (Wh) per hour of the current day, together
+    with a timestamp within that day. Every hour that started already becomes a
+    row of the external statistic ``ecoflow_cloud:<sn>_<name>``, which the energy
+    dashboard can use directly. Reports are accepted from any thread, the import
+    runs on the event loop; rows of a day are rewritten while the day fills up.
+    """
+
+    def __init__(self, hass: HomeAssistant, sn: str, device_name: str) -> None:
+        self.__hass = hass
+        self.__sn = sn
+        self.__device_name = device_name
+        self.__lock = threading.Lock()
+        # name -> (timestamp, watt hours per hour of the day), latest report only
+        self.__pending: dict[str, tuple[int, list[int]]] = {}
+        self.__scheduled = False
+        self.__import_lock = asyncio.Lock()
+        # name -> (day start, sum of the statistic before that day)
+        self.__baselines: dict[str, tuple[datetime.datetime, float]] = {}
+
+    def statistic_id(self, name: str) -> str:
+        return f"{ECOFLOW_DOMAIN}:{self.__sn.lower()}_{name}"
+
+    def report(self, name: str, timestamp: int, watth: list[int]):
+        with self.__lock:
+            self.__pending[name] = (timestamp, watth)
+            if self.__scheduled:
+                return
+            self.__scheduled = True
+        self.__hass.loop.call_soon_threadsafe(self.__schedule_import)
+
+    @callback
+    def __schedule_import(self):
+        self.__hass.async_create_background_task(
+            self.__async_import(), f"{ECOFLOW_DOMAIN} {self.__sn} energy statistics"
+        )
+
+    async def __async_import(self):
+        with self.__lock:
+            pending, self.__pending = self.__pending, {}
+            self.__scheduled = False
+        if "recorder" not in self.__hass.config.components:
+            return
+
+        async with self.__import_lock:
+            for name, (timestamp, watth) in pending.items():
+                try:
+                    await self.__async_import_day(name, timestamp, watth)
+                except Exception as error:  # noqa: BLE001
+                    _LOGGER.warning(
+                        "Importing %s statistics of %s failed: %s",
+                        name,
+                        self.__sn,
+                        error,
+                    )
+
+    async def __async_import_day(self, name: str, timestamp: int, watth: list[int]):
+        from homeassistant.components.recorder.models import (
+            StatisticData,
+            StatisticMetaData,
+        )
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+        )
+
+        day_start = dt.as_utc(
+            dt.start_of_local_day(dt.as_local(dt.utc_from_timestamp(timestamp)))
+        )
+        now = dt.utcnow()
+        statistic_id = self.statistic_id(name)
+        baseline = await self.__async_baseline(name, statistic_id, day_start, watth)
+        if baseline is None:
+            return
+
+        rows = list[StatisticData]()
+        total = baseline
+        for hour, value in enumerate(watth):
+            start = day_start + hour * _HOUR
+            if start > now:
+                break
+            total += value
+            rows.append(StatisticData(start=start, state=value, sum=total))
+        if not rows:
+            return
+
+        metadata = StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=f"{self.__device_name} {name.replace('_', ' ')}",
+            source=ECOFLOW_DOMAIN,
+            statistic_id=statistic_id,
+            unit_of_measurement=UnitOfEnergy.WATT_HOUR,
+        )
+        async_add_external_statistics(self.__hass, metadata, rows)
+
+    async def __async_baseline(
+        self,
+        name: str,
+        statistic_id: str,
+        day_start: datetime.datetime,
+        watth: list[int],
+    ) -> float | None:
+        """Sum of the statistic before ``day_start``, queried once per day.
+
+        None for a report of a day before the last imported one.
+        """
+        cached = self.__baselines.get(name)
+        if cached is not None and cached[0] == day_start:
+            return cached[1]
+        if cached is not None and cached[0] > day_start:
+            return None
+
+        from homeassistant.components.recorder import get_instance
+        from homeassistant.components.recorder.statistics import get_last_statistics
+
+        recorder = get_instance(self.__hass)
+        last = await recorder.async_add_executor_job(
+            get_last_statistics, self.__hass, 1, statistic_id, True, {"state", "sum"}
+        )
+        baseline = 0.0
+        if rows := last.get(statistic_id):
+            last_start = dt.utc_from_timestamp(rows[0]["start"])
+            baseline = rows[0]["sum"] or 0.0
+            next_day = dt.as_local(day_start).date() + datetime.timedelta(days=1)
+            day_end = dt.as_utc(dt.start_of_local_day(next_day))
+            if day_start <= last_start < day_end:
+                # already imported today (restart): remove the hours of this day,
+                # the last imported hour may have been incomplete
+                hours = min(max(int((last_start - day_start) / _HOUR), 0), len(watth))
+                baseline -= (rows[0]["state"] or 0.0) + sum(watth[:hours])
+            elif last_start >= day_end:
+                # a row of a later day (clock change, foreign import) does not
+                # match the hours of this report, use the last one before it
+                baseline = await recorder.async_add_executor_job(
+                    self.__last_sum_before, statistic_id, day_start
+                )
+
+        self.__baselines[name] = (day_start, baseline)
+        return baseline
+
+    def __last_sum_before(self, statistic_id: str, day_start: datetime.datetime):
+        from homeassistant.components.recorder.statistics import (
+            statistics_during_period,
+        )
+
+        rows = statistics_during_period(
+            self.__hass,
+            day_start - _BASELINE_LOOKBACK,
+            day_start,
+            {statistic_id},
+            "hour",
+            None,
+            {"sum"},
+        ).get(statistic_id)
+        return (rows[-1]["sum"] or 0.0) if rows else 0.0
@@ -3,7 +3,6 @@ from __future__ import annotations
 import inspect
 from typing import Any, Callable, Mapping, OrderedDict, cast
 
-import jsonpath_ng.ext as jp
 from homeassistant.components.button import ButtonEntity
 from homeassistant.components.number import NumberEntity
 from homeassistant.components.select import SelectEntity
@@ -18,6 +17,8 @@ from ..devices import (
     BaseDevice,
     EcoflowDeviceUpdateCoordinator,
 )
+from ..devices.key_path import MISSING, KeyPathGetter, compile_key_path
+from ..devices.projection import KeyRecorder
 
 
 class EcoFlowAbstractEntity(CoordinatorEntity[EcoflowDeviceUpdateCoordinator]):
@@ -77,18 +78,27 @@ class EcoFlowDictEntity(EcoFlowAbstractEntity):
         super().__init__(client, device, title, mqtt_key)
 
         self.__mqtt_key = mqtt_key
+        self._register_known_keys(mqtt_key)
         self._mqtt_key_adopted = self._adopt_json_key(mqtt_key)
-        self._mqtt_key_expr = jp.parse(self._mqtt_key_adopted)
+        self._mqtt_key_getter = compile_key_path(self._mqtt_key_adopted)
 
         self._auto_enable = auto_enable
         self._attr_entity_registry_enabled_default = enabled
         self._attr_entity_registry_visible_default = enabled
         self._attr_available = enabled
         self.__attributes_mapping: dict[str, str] = {}
+        self.__attribute_getters: dict[str, KeyPathGetter] = {}
         self.__attrs = OrderedDict[str, Any]()
+        # params keys this entity reacts to, None for all of them
+        self.__watched_keys: frozenset[str] | None = None
+        self.__synced = False
 
     def attr(self, mqtt_key: str, title: str, default: Any) -> EcoFlowDictEntity:
         self.__attributes_mapping[mqtt_key] = title
+        self.__attribute_getters[mqtt_key] = compile_key_path(
+            self._adopt_json_key(mqtt_key)
+        )
+        self._register_known_keys(mqtt_key)
         self.__attrs[title] = default
         return self
 
@@ -110,32 +120,60 @@ class EcoFlowDictEntity(EcoFlowAbstractEntity):
     def enabled_default(self):
         return self._attr_entity_registry_enabled_default
 
+    def _register_known_keys(self, *keys: str):
+        # unknown key telemetry only compares flat keys
+        if self._device.flat_json():
+            self._device.telemetry.add_known_keys(keys)
+
+    def _projection_keys(self) -> set[str] | None:
+        """Params keys read by this entity, None if they cannot be determined."""
+        if not self._device.flat_json():
+            return None
+        return {self.__mqtt_key, *self.__attributes_mapping}
+
     async def async_added_to_hass(self):
+        keys = self._projection_keys()
+        self.__watched_keys = None if keys is None else frozenset(keys)
+        # the coordinator indexes listeners with keys, see async_add_listener
+        self.coordinator_context = self.__watched_keys
         await super().async_added_to_hass()
+        self._device.projection.add(keys)
+        if keys is not None:
+            self.async_on_remove(lambda: self._device.projection.remove(keys))
         # d = self._device.data.params_observable().subscribe(self._updated)
         # self.async_on_remove(d.dispose)
 
     def _handle_coordinator_update(self) -> None:
-        if self.coordinator.data.changed:
-            self._updated(self.coordinator.data.data_holder.params)
+        data = self.coordinator.data
+        if self.__synced and not data.changed:
+            return
+        if (
+            self.__synced
+            and data.changed_keys is not None
+            and self.__watched_keys is not None
+            and data.changed_keys.isdisjoint(self.__watched_keys)
+        ):
+            return
+        # the first update reads everything, later ones only what changed
+        self.__synced = True
+        self._updated(data.data_holder.params)
 
     def _updated(self, data: dict[str, Any]):
         # update attributes
         for key, title in self.__attributes_mapping.items():
-            key_expr = jp.parse(self._adopt_json_key(key))
-            attr_values = key_expr.find(data)
-            if len(attr_values) == 1:
-                self.__attrs[title] = attr_values[0].value
+            attr_value = self.__attribute_getters[key](data)
+            if attr_value is not MISSING:
+                self.__attrs[title] = attr_value
 
         # update value
-        values = self._mqtt_key_expr.find(data)
-        if len(values) == 1:
+        value = self._mqtt_key_getter(data)
+        if value is not MISSING:
             self._attr_available = True
             if self._auto_enable:
                 self._attr_entity_registry_enabled_default = True
                 self._attr_entity_registry_visible_default = True
 
-            if self._update_value(values[0].value):
+            if self._update_value(value):
                 self.schedule_update_ha_state()
 
     @property
@@ -161,6 +199,36 @@ class EcoFlowBaseCommandEntity[_CommandArg](EcoFlowDictEntity):
     ):
         super().__init__(client, device, mqtt_key, title, enabled, auto_enable)
         self._command = command
+        # a command target of this entity is not confirmed by the device yet
+        self.__pending = False
+
+    def _projection_keys(self) -> set[str] | None:
+        keys = super()._projection_keys()
+        if keys is None or self._command is None:
+            return keys
+        if len(inspect.signature(self._command).parameters) != 2:
+            return keys
+        # commands built from the current params, record the keys they read
+        recorder = KeyRecorder()
+        try:
+            self._command(cast(_CommandArg, 0), recorder)
+        except Exception:  # noqa: BLE001
+            return None
+        return keys | recorder.read_keys
+
+    def _updated(self, data: dict[str, Any]):
+        pending = self._device.data.target_pending(self._mqtt_key_adopted)
+        if pending != self.__pending:
+            self.__pending = pending
+            self.schedule_update_ha_state()
+        super()._updated(data)
+
+    @property
+    def extra_state_attributes(self) -> Mapping[str, Any] | None:
+        attrs = super().extra_state_attributes
+        if not self.__pending:
+            return attrs
+        return {**(attrs or {}), "pending": True}
 
     def command_dict(self, value: _CommandArg) -> dict[str, Any] | Message | None:
         if self._command:
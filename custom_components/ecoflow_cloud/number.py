@@ -4,10 +4,10 @@ from homeassistant.components.number import NumberMode
 from homeassistant.components.sensor import SensorDeviceClass
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import PERCENTAGE, UnitOfPower, UnitOfTemperature
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import ECOFLOW_DOMAIN
+from . import ECOFLOW_DOMAIN, async_track_devices
 from .api import EcoflowApiClient, Message
 from .devices import BaseDevice
 from .entities import BaseNumberEntity
@@ -17,9 +17,13 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ):
     client: EcoflowApiClient = hass.data[ECOFLOW_DOMAIN][entry.entry_id]
-    for sn, device in client.devices.items():
+
+    @callback
+    def add_device_entities(device: BaseDevice):
         async_add_entities(device.numbers(client))
 
+    async_track_devices(hass, entry, add_device_entities)
+
 
 class ValueUpdateEntity(BaseNumberEntity):
     _attr_native_step = 1
@@ -130,6 +134,13 @@ class BatteryBackupLevel(MinMaxLevelEntity):
         super().__init__(client, device, mqtt_key, title, min_value, max_value, command)
         self._min_key = min_key
         self._max_key = max_key
+        self._register_known_keys(min_key, max_key)
+
+    def _projection_keys(self) -> set[str] | None:
+        keys = super()._projection_keys()
+        if keys is None:
+            return None
+        return keys | {self._min_key, self._max_key}
 
     def _updated(self, data: dict[str, Any]):
         if self._min_key in data:
@@ -0,0 +1,111 @@
+import logging
+import threading
+import time
+from typing import Any
+
+ERROR_REPORT_INTERVAL = 60.0
+PAYLOAD_SAMPLE_EVERY = 20
+PAYLOAD_LOG_LIMIT = 256
+
+_BINARY_TYPES = (bytes, bytearray, memoryview)
+
+
+class LazyHex:
+    """Hex dump of a payload, only computed if the record is emitted.
+
+    Text payloads (JSON) are logged as they are, both are truncated to ``limit``.
+    """
+
+    __slots__ = ("__data", "__limit")
+
+    def __init__(
+        self, data: bytes | memoryview | str, limit: int = PAYLOAD_LOG_LIMIT
+    ):
+        self.__data = data
+        self.__limit = limit
+
+    def __str__(self) -> str:
+        data = self.__data
+        suffix = "" if len(data) <= self.__limit else f"... ({len(data)} bytes)"
+        if isinstance(data, str):
+            return data[: self.__limit] + suffix
+        return bytes(data[: self.__limit]).hex() + suffix
+
+
+class PayloadSampler:
+    """Logs one in ``every`` payloads of a device at debug level.
+
+    The level is checked before anything else, with debug logging disabled a call
+    costs one method call and no argument is formatted. Binary arguments are
+    wrapped in ``LazyHex`` only when the message is logged.
+    """
+
+    def __init__(self, every: int = PAYLOAD_SAMPLE_EVERY) -> None:
+        self.__every = max(every, 1)
+        self.__count = 0
+
+    def debug(self, logger: logging.Logger, msg: str, *args: Any):
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        # racy between ingest workers, an approximate rate is good enough
+        self.__count += 1
+        if self.__count >= self.__every:
+            self.__count = 0
+            logger.debug(
+                msg,
+                *(
+                    LazyHex(arg) if isinstance(arg, _BINARY_TYPES) else arg
+                    for arg in args
+                ),
+            )
+
+
+class RateLimitedLog:
+    """Logs a message at most once per interval and source.
+
+    The number of suppressed messages is appended to the next one that is logged,
+    the payload (if any) is dumped at debug level only with the logged message.
+    """
+
+    def __init__(
+        self, logger: logging.Logger, interval: float = ERROR_REPORT_INTERVAL
+    ) -> None:
+        self.__logger = logger
+        self.__interval = interval
+        self.__lock = threading.Lock()
+        # (source, msg) -> (next report time, messages suppressed since)
+        self.__state: dict[tuple[str, str], tuple[float, int]] = {}
+
+    def log(
+        self,
+        level: int,
+        source: str,
+        msg: str,
+        *args: Any,
+        payload: bytes | memoryview | str | None = None,
+    ):
+        if not self.__logger.isEnabledFor(level):
+            return
+        key = (source, msg)
+        now = time.monotonic()
+        with self.__lock:
+            next_report, suppressed = self.__state.get(key, (0.0, 0))
+            if now < next_report:
+                self.__state[key] = (next_report, suppressed + 1)
+                return
+            self.__state[key] = (now + self.__interval, 0)
+
+        if suppressed:
+            self.__logger.log(
+                level, f"{msg} (%d similar messages suppressed)", *args, suppressed
+            )
+        else:
+            self.__logger.log(level, msg, *args)
+        if payload is not None:
+            self.__logger.debug("Payload from %s: %s", source, LazyHex(payload))
+
+    def error(self, source: str, msg: str, *args: Any, payload=None):
+        self.log(logging.ERROR, source, msg, *args, payload=payload)
+
+    def info(self, source: str, msg: str, *args: Any, payload=None):
+        self.log(logging.INFO, source, msg, *args, payload=payload)
@@ -1,6 +1,12 @@
 from homeassistant.core import callback, HomeAssistant
 
 from . import (
+    ATTR_COMMAND_RTT_AVG,
+    ATTR_COMMAND_RTT_MAX,
+    ATTR_COMMANDS_LOST,
+    ATTR_COMMANDS_PENDING,
+    ATTR_COMMANDS_REPLIED,
+    ATTR_COMMANDS_SENT,
     ATTR_STATUS_UPDATES,
     ATTR_STATUS_DATA_LAST_UPDATE,
     ATTR_STATUS_LAST_UPDATE,
@@ -17,4 +23,11 @@ def exclude_attributes(hass: HomeAssistant) -> set[str]:
         ATTR_STATUS_LAST_UPDATE,
         ATTR_STATUS_PHASE,
         ATTR_QUOTA_REQUESTS,
+        # change with every command
+        ATTR_COMMANDS_SENT,
+        ATTR_COMMANDS_REPLIED,
+        ATTR_COMMANDS_LOST,
+        ATTR_COMMANDS_PENDING,
+        ATTR_COMMAND_RTT_AVG,
+        ATTR_COMMAND_RTT_MAX,
     }
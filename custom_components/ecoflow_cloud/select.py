@@ -1,11 +1,11 @@
 from typing import Any, Callable
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import ECOFLOW_DOMAIN
+from . import ECOFLOW_DOMAIN, async_track_devices
 from .api import EcoflowApiClient, Message
 from .devices import BaseDevice
 from .entities import BaseSelectEntity
@@ -15,9 +15,13 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ):
     client: EcoflowApiClient = hass.data[ECOFLOW_DOMAIN][entry.entry_id]
-    for sn, device in client.devices.items():
+
+    @callback
+    def add_device_entities(device: BaseDevice):
         async_add_entities(device.selects(client))
 
+    async_track_devices(hass, entry, add_device_entities)
+
 
 class DictSelectEntity(BaseSelectEntity[int]):
     _attr_entity_category = EntityCategory.CONFIG
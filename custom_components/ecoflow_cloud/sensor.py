@@ -25,19 +25,27 @@ from homeassistant.const import (
     UnitOfTemperature,
     UnitOfTime,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.util import dt
 
 from . import (
+    ATTR_COMMAND_RTT_AVG,
+    ATTR_COMMAND_RTT_MAX,
+    ATTR_COMMANDS_LOST,
+    ATTR_COMMANDS_PENDING,
+    ATTR_COMMANDS_REPLIED,
+    ATTR_COMMANDS_SENT,
     ATTR_MQTT_CONNECTED,
     ATTR_QUOTA_REQUESTS,
     ATTR_STATUS_DATA_LAST_UPDATE,
     ATTR_STATUS_PHASE,
+    ATTR_STATUS_RECONNECT_STORMS,
     ATTR_STATUS_RECONNECTS,
     ATTR_STATUS_SN,
     ECOFLOW_DOMAIN,
+    async_track_devices,
 )
 from .api import EcoflowApiClient
 from .devices import BaseDevice, const
@@ -54,7 +62,9 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ):
     client: EcoflowApiClient = hass.data[ECOFLOW_DOMAIN][entry.entry_id]
-    for sn, device in client.devices.items():
+
+    @callback
+    def add_device_entities(device: BaseDevice):
         sensors = device.sensors(client)
         # Add regular sensors
         async_add_entities(sensors)
@@ -65,6 +75,10 @@ async def async_setup_entry(
         )
         async_add_entities(map(lambda s: s.energy_sensor(), integralSensors))
 
+        async_add_entities([CommandLatencySensorEntity(client, device)])
+
+    async_track_devices(hass, entry, add_device_entities)
+
 
 class MiscBinarySensorEntity(BinarySensorEntity, EcoFlowDictEntity):
     def _update_value(self, val: Any) -> bool:
@@ -602,18 +616,58 @@ class ReconnectStatusSensorEntity(StatusSensorEntity):
         super().__init__(client, device)
         self._attrs[ATTR_STATUS_PHASE] = 0
         self._attrs[ATTR_STATUS_RECONNECTS] = 0
+        self._attrs[ATTR_STATUS_RECONNECT_STORMS] = 0
 
     def _actualize_status(self) -> bool:
         time_to_reconnect = self._skip_count in self.CONNECT_PHASES
 
+        # storms of the shared connection, dropped connections included
+        storms = self._client.mqtt_client.reconnect_stats()["storms"]
+        changed = storms != self._attrs[ATTR_STATUS_RECONNECT_STORMS]
+        self._attrs[ATTR_STATUS_RECONNECT_STORMS] = storms
+
         if self._online == _OnlineStatus.ONLINE and time_to_reconnect:
-            self._attrs[ATTR_STATUS_RECONNECTS] = (
-                self._attrs[ATTR_STATUS_RECONNECTS] + 1
-            )
-            self._client.mqtt_client.reconnect()
+            # all status sensors share one reconnect, only count accepted ones
+            if self._client.mqtt_client.reconnect():
+                self._attrs[ATTR_STATUS_RECONNECTS] = (
+                    self._attrs[ATTR_STATUS_RECONNECTS] + 1
+                )
             return True
         else:
-            return super()._actualize_status()
+            return super()._actualize_status() or changed
+
+
+class CommandLatencySensorEntity(SensorEntity, EcoFlowAbstractEntity):
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, client: EcoflowApiClient, device: BaseDevice):
+        super().__init__(client, device, "Command Latency", "command_latency")
+        self._attrs = OrderedDict[str, Any]()
+
+    def _handle_coordinator_update(self) -> None:
+        stats = self._device.command_tracker.stats()
+        # excluded from the recorder, see recorder.py
+        attrs = OrderedDict[str, Any](
+            (
+                (ATTR_COMMANDS_SENT, stats["sent"]),
+                (ATTR_COMMANDS_REPLIED, stats["replied"]),
+                (ATTR_COMMANDS_LOST, stats["lost"]),
+                (ATTR_COMMANDS_PENDING, stats["pending"]),
+                (ATTR_COMMAND_RTT_AVG, stats["rtt"]["avg_ms"]),
+                (ATTR_COMMAND_RTT_MAX, stats["rtt"]["max_ms"]),
+            )
+        )
+        if stats["last_rtt_ms"] != self._attr_native_value or attrs != self._attrs:
+            self._attr_native_value = stats["last_rtt_ms"]
+            self._attrs = attrs
+            self.schedule_update_ha_state()
+
+    @property
+    def extra_state_attributes(self) -> Mapping[str, Any] | None:
+        return self._attrs
 
 
 class IntegralEnergySensorEntity(IntegrationSensor):
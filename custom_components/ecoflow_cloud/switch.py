@@ -2,7 +2,7 @@ import logging
 from typing import Any, Callable
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
@@ -10,7 +10,7 @@ from custom_components.ecoflow_cloud.devices import (
     BaseDevice,
 )
 
-from . import ECOFLOW_DOMAIN
+from . import ECOFLOW_DOMAIN, async_track_devices
 from .api import EcoflowApiClient, Message
 from .entities import BaseSwitchEntity
 
@@ -21,9 +21,13 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ):
     client: EcoflowApiClient = hass.data[ECOFLOW_DOMAIN][entry.entry_id]
-    for sn, device in client.devices.items():
+
+    @callback
+    def add_device_entities(device: BaseDevice):
         async_add_entities(device.switches(client))
 
+    async_track_devices(hass, entry, add_device_entities)
+
 
 class EnabledEntity(BaseSwitchEntity[int]):
     def __init__(
@@ -0,0 +1,54 @@
+import random
+
+from custom_components.ecoflow_cloud.devices.public.data_bridge import (
+    PlainFlattener,
+    to_plain,
+)
+
+from .benchmark import compare
+from .test_data_bridge import GOLDEN, _assert_same, _payload
+
+# a pdStatus quota of a Delta Pro, a few nested values among flat ones
+QUOTA = {
+    "typeCode": "pdStatus",
+    "params": {
+        **{f"value{i}": i for i in range(150)},
+        **{f"group{i}": {"watts": i, "vol": i * 10} for i in range(10)},
+    },
+    "moduleSn": "M1",
+    "time": 3,
+}
+PROJECTED = frozenset(
+    [f"pd.value{i}" for i in range(0, 150, 10)] + ["pd.group1.watts", "pd.group4"]
+)
+
+
+def test_flattener_against_to_plain():
+    rnd = random.Random(12)
+    corpus = GOLDEN + [_payload(rnd) for _ in range(500)]
+    flatten = PlainFlattener()
+    for raw in corpus:
+        _assert_same(flatten(raw), to_plain(raw))
+
+    compare(
+        "flatten the payload corpus",
+        lambda: [flatten(raw) for raw in corpus],
+        lambda: [to_plain(raw) for raw in corpus],
+        number=20,
+    )
+    compare("flatten a quota", lambda: flatten(QUOTA), lambda: to_plain(QUOTA))
+
+
+def test_projected_flattener_against_to_plain():
+    flatten = PlainFlattener()
+    expected = to_plain(QUOTA)["params"]
+    params = flatten(QUOTA, PROJECTED)["params"]
+    assert PROJECTED <= params.keys()
+    assert {k: expected[k] for k in params} == params
+
+    compare(
+        "flatten a quota, 17 keys projected",
+        lambda: flatten(QUOTA, PROJECTED),
+        lambda: to_plain(QUOTA),
+        min_speedup=2.0,
+    )
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+pytest.importorskip("google.protobuf")
+
+from google.protobuf.json_format import MessageToDict  # noqa: E402
+
+from custom_components.ecoflow_cloud.devices.internal.proto.support.extractor import (  # noqa: E402
+    ProtoExtractor,
+    _is_plain,
+)
+
+from .benchmark import compare  # noqa: E402
+from .test_extractor import MESSAGE_TYPES, _fill  # noqa: E402
+
+
+def _message_to_dict(message_type, pdata: bytes, params: dict):
+    """The extraction before ProtoExtractor: MessageToDict and prefixed keys."""
+    message = message_type()
+    message.ParseFromString(pdata)
+    for key, value in MessageToDict(message, preserving_proto_field_name=False).items():
+        params[f"20_1.{key}"] = value
+
+
+@pytest.mark.parametrize(
+    "message_type", dict.fromkeys(MESSAGE_TYPES), ids=lambda t: t.DESCRIPTOR.name
+)
+def test_extract_against_message_to_dict(message_type):
+    rnd = random.Random(message_type.DESCRIPTOR.full_name)
+    corpus = []
+    for _ in range(50):
+        message = message_type()
+        _fill(rnd, message)
+        corpus.append(message.SerializeToString())
+    extractor = ProtoExtractor(message_type, "20_1.")
+
+    def extract():
+        for pdata in corpus:
+            extractor.extract(pdata, {})
+
+    def baseline():
+        for pdata in corpus:
+            _message_to_dict(message_type, pdata, {})
+
+    # types with converted fields fall back to MessageToDict, only report them
+    plain = all(_is_plain(field) for field in message_type.DESCRIPTOR.fields)
+    compare(
+        f"extract {message_type.DESCRIPTOR.name}",
+        extract,
+        baseline,
+        number=20,
+        min_speedup=1.0 if plain else 0.0,
+    )
@@ -0,0 +1,85 @@
+import json
+import random
+
+import pytest
+
+from custom_components.ecoflow_cloud.api.router import EcoflowTopicRouter
+from custom_components.ecoflow_cloud.device_data import DeviceData, DeviceOptions
+from custom_components.ecoflow_cloud.devices import (
+    EcoflowDeviceInfo,
+    EcoflowTopicHandler,
+)
+from custom_components.ecoflow_cloud.devices.json_decode import decode_json
+
+from .benchmark import compare
+from .test_data_bridge import _payload
+
+PARENT_SN = "M106ZAB4Z000001"
+DATA_TOPIC = f"/open/user/{PARENT_SN}/quota"
+
+
+class _Device:
+    """A PowerKit like device, sub devices share the data topic of the parent."""
+
+    def __init__(self, sn: str, parent: DeviceData | None = None) -> None:
+        self.device_info = EcoflowDeviceInfo(
+            True, PARENT_SN, sn, "POWERKIT", 1, DATA_TOPIC, "set", "reply", None, None
+        )
+        self.device_data = DeviceData(
+            sn, sn, "POWERKIT", DeviceOptions(15, 100, False), None, parent
+        )
+        self.received = 0
+
+    def prepare(self, raw_data: bytes):
+        return decode_json(raw_data, self.device_info.sn)
+
+    def apply(self, raw):
+        # EcoflowDataHolder only accepts data of its own module
+        if self.device_data.parent is not None and (
+            raw.get("moduleSn") != self.device_data.sn
+        ):
+            return
+        self.received += 1
+
+    def topic_handlers(self) -> dict[str, EcoflowTopicHandler]:
+        return {DATA_TOPIC: EcoflowTopicHandler(self.prepare, self.apply, True)}
+
+
+@pytest.mark.parametrize("modules", [2, 8, 32])
+def test_decode_once_against_decoding_per_device(modules: int):
+    parent = _Device(PARENT_SN)
+    devices = [parent] + [
+        _Device(f"M10{n:012}", parent.device_data) for n in range(modules)
+    ]
+    router = EcoflowTopicRouter()
+    for device in devices:
+        router.add_device(device)
+
+    rnd = random.Random(modules)
+    payloads = [
+        json.dumps(
+            {**_payload(rnd), "moduleSn": devices[1 + n % modules].device_data.sn}
+        ).encode()
+        for n in range(16)
+    ]
+
+    def per_device():
+        # every device decoded the payload and its holder dropped foreign modules
+        for payload in payloads:
+            for device in devices:
+                device.apply(device.prepare(payload))
+
+    def fanout():
+        for payload in payloads:
+            for group in router.route(DATA_TOPIC).fanouts:
+                group.dispatch(group.prepare(payload))
+
+    # both deliver every payload to the parent and to its module once
+    for deliver in (per_device, fanout):
+        for device in devices:
+            device.received = 0
+        deliver()
+        assert parent.received == len(payloads)
+        assert sum(d.received for d in devices[1:]) == len(payloads)
+
+    compare(f"fan out a payload, {modules} modules", fanout, per_device, number=100)
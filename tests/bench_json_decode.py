@@ -0,0 +1,34 @@
+import json
+import random
+
+from custom_components.ecoflow_cloud.devices.json_decode import decode_json
+
+from .benchmark import compare
+from .test_data_bridge import _payload
+from .test_json_decode import PAYLOADS, _baseline
+
+QUOTA = json.dumps(
+    {"params": {f"pd.value{i}": i * 0.5 for i in range(300)}, "id": 1}
+).encode()
+
+
+def test_decode_against_the_baseline():
+    rnd = random.Random(0)
+    corpus = [json.dumps(_payload(rnd)).encode() for _ in range(200)]
+    # valid UTF-8 payloads take the fast path, assert it for them
+    corpus += PAYLOADS[:2]
+    assert [decode_json(raw, "bench") for raw in corpus] == [
+        _baseline(raw) for raw in corpus
+    ]
+
+    compare(
+        "decode the payload corpus",
+        lambda: [decode_json(raw, "bench") for raw in corpus],
+        lambda: [_baseline(raw) for raw in corpus],
+        number=50,
+    )
+    compare(
+        "decode a 300 key quota",
+        lambda: decode_json(QUOTA, "bench"),
+        lambda: _baseline(QUOTA),
+    )
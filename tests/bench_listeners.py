@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.ecoflow_cloud.devices import (
+    EcoflowBroadcastDataHolder,
+    EcoflowDeviceUpdateCoordinator,
+)
+from custom_components.ecoflow_cloud.devices.data_holder import EcoflowDataHolder
+from custom_components.ecoflow_cloud.devices.key_path import compile_key_path
+
+from .benchmark import compare
+
+CHANGED = 10
+
+
+def _add_listeners(coordinator, params: dict, count: int, indexed: bool) -> list:
+    """Entities reading their key, subscribed with it as context if ``indexed``."""
+    calls = [0]
+
+    def listener(key: str):
+        getter = compile_key_path(key)
+
+        def update():
+            getter(params)
+            calls[0] += 1
+
+        return update
+
+    for n in range(count):
+        key = f"pd.value{n}"
+        coordinator.async_add_listener(
+            listener(key), frozenset({key}) if indexed else None
+        )
+    return calls
+
+
+@pytest.mark.parametrize("count", [50, 100, 300])
+def test_key_index_against_calling_every_listener(count: int):
+    async def run():
+        hass = HomeAssistant("/tmp")
+        params = {f"pd.value{n}": n for n in range(count)}
+        holder = EcoflowDataHolder(lambda m: m, loop=asyncio.get_running_loop())
+        changed = frozenset(f"pd.value{n}" for n in range(0, count, count // CHANGED))
+        coordinators = []
+        for indexed in (True, False):
+            coordinator = EcoflowDeviceUpdateCoordinator(hass, holder, 15)
+            calls = _add_listeners(coordinator, params, count, indexed)
+            coordinator.data = EcoflowBroadcastDataHolder(holder, True, changed)
+            # new keyed listeners are called once after they subscribed
+            coordinator.async_update_listeners()
+            calls[0] = 0
+            coordinator.async_update_listeners()
+            assert calls[0] == (len(changed) if indexed else count)
+            coordinators.append(coordinator)
+
+        indexed, plain = coordinators
+        compare(
+            f"broadcast {len(changed)} changed keys, {count} listeners",
+            indexed.async_update_listeners,
+            plain.async_update_listeners,
+            number=200,
+        )
+
+    asyncio.run(run())
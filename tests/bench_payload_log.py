@@ -0,0 +1,44 @@
+import io
+import logging
+import random
+
+import pytest
+
+from custom_components.ecoflow_cloud.payload_log import PayloadSampler
+
+from .benchmark import compare
+from .test_framing import _corpus
+
+MSG = 'cmd_func %u, cmd_id %u, payload "%s"'
+
+
+@pytest.mark.parametrize("level", [logging.INFO, logging.DEBUG], ids=["off", "on"])
+def test_sampled_lazy_log_against_eager_hex(level: int):
+    rnd = random.Random(7)
+    frames = [frame for _ in range(50) for frame, _ in _corpus(rnd)[1]]
+    logger = logging.getLogger("bench_payload_log")
+    logger.propagate = False
+    handler = logging.StreamHandler(io.StringIO())
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    sampler = PayloadSampler()
+
+    def sampled():
+        for frame in frames:
+            sampler.debug(logger, MSG, 20, 1, frame)
+
+    def eager():
+        # PowerStream._prepare_data before the sampler
+        for frame in frames:
+            logger.debug(MSG, 20, 1, frame.hex())
+
+    debug = "on" if level == logging.DEBUG else "off"
+    try:
+        compare(
+            f"log {len(frames)} frames, debug {debug}",
+            sampled,
+            eager,
+            number=100,
+        )
+    finally:
+        logger.removeHandler(handler)
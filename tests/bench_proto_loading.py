@@ -0,0 +1,52 @@
+import pathlib
+import subprocess
+import sys
+
+from .benchmark import REPEAT
+
+ROOT = pathlib.Path(__file__).parent.parent
+
+# runs in a fresh interpreter, prints the seconds the loading took
+SCRIPT = """
+import sys
+import time
+
+from custom_components.ecoflow_cloud import devices
+
+start = time.perf_counter()
+devices.load_device_modules(["DELTA_2", "RIVER_2"])
+if {preload}:
+    # _preload_proto, imported by every installation before
+    from custom_components.ecoflow_cloud.devices.internal.proto import (
+        ecopacket_pb2,
+        platform_pb2,
+        powerstream_pb2,
+    )
+elapsed = time.perf_counter() - start
+assert ("google.protobuf" in sys.modules) == {preload}
+print(elapsed)
+"""
+
+
+def _best_load_time(preload: bool) -> float:
+    times = []
+    for _ in range(REPEAT):
+        result = subprocess.run(
+            [sys.executable, "-c", SCRIPT.format(preload=preload)],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        times.append(float(result.stdout))
+    return min(times)
+
+
+def test_json_devices_against_preloading_protobuf():
+    fast = _best_load_time(False)
+    baseline = _best_load_time(True)
+    print(
+        f"load JSON devices: {fast * 1e3:.1f} ms,"
+        f" with protobuf preloaded {baseline * 1e3:.1f} ms"
+    )
+    assert fast < baseline
@@ -0,0 +1,96 @@
+import pytest
+
+from custom_components.ecoflow_cloud.api.router import EcoflowTopicRouter
+from custom_components.ecoflow_cloud.device_data import DeviceData, DeviceOptions
+from custom_components.ecoflow_cloud.devices import (
+    EcoflowDeviceInfo,
+    EcoflowTopicHandler,
+)
+
+from .benchmark import compare
+
+PAYLOAD = b'{"params": {"soc": 50}}'
+
+
+class _Device:
+    """The topics and handlers of a device, decoding does not matter here."""
+
+    def __init__(self, sn: str) -> None:
+        base = f"/open/user/{sn}"
+        self.device_info = EcoflowDeviceInfo(
+            True,
+            sn,
+            sn,
+            "DELTA_2",
+            1,
+            f"{base}/quota",
+            f"{base}/set",
+            f"{base}/set_reply",
+            f"{base}/get",
+            f"{base}/get_reply",
+            f"{base}/status",
+        )
+        self.device_data = DeviceData(
+            sn, sn, "DELTA_2", DeviceOptions(15, 100, False), None, None
+        )
+        self.received = 0
+
+    def prepare(self, raw_data: bytes):
+        return raw_data
+
+    def apply(self, raw):
+        self.received += 1
+
+    def topic_handlers(self) -> dict[str, EcoflowTopicHandler]:
+        handler = EcoflowTopicHandler(self.prepare, self.apply)
+        return {topic: handler for topic in self.device_info.topics()}
+
+    def update_data(self, raw_data: bytes, data_type: str) -> bool:
+        """BaseDevice.update_data before the router: an if/elif over the topics."""
+        info = self.device_info
+        if data_type == info.data_topic:
+            self.apply(self.prepare(raw_data))
+        elif data_type == info.set_topic:
+            self.apply(self.prepare(raw_data))
+        elif data_type == info.set_reply_topic:
+            self.apply(self.prepare(raw_data))
+        elif data_type == info.get_topic:
+            self.apply(self.prepare(raw_data))
+        elif data_type == info.get_reply_topic:
+            self.apply(self.prepare(raw_data))
+        elif data_type == info.status_topic:
+            self.apply(self.prepare(raw_data))
+        else:
+            return False
+        return True
+
+
+@pytest.mark.parametrize("count", [30, 300])
+def test_topic_index_against_scanning_devices(count: int):
+    devices = [_Device(f"R331ZEB4ZE{n:06}") for n in range(count)]
+    router = EcoflowTopicRouter()
+    for device in devices:
+        router.add_device(device)
+    topics = [devices[n].device_info.data_topic for n in range(0, count, 7)]
+
+    def scan():
+        # EcoflowMQTTClient._on_message before the router
+        for topic in topics:
+            for device in devices:
+                device.update_data(PAYLOAD, topic)
+
+    def route():
+        for topic in topics:
+            for fanout in router.route(topic).fanouts:
+                fanout.dispatch(fanout.prepare(PAYLOAD))
+
+    # both deliver the messages to the same devices
+    for deliver in (scan, route):
+        for device in devices:
+            device.received = 0
+        deliver()
+        assert [d.received for d in devices] == [
+            1 if n % 7 == 0 else 0 for n in range(count)
+        ]
+
+    compare(f"route a message, {count} devices", route, scan, number=200)
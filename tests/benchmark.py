@@ -0,0 +1,36 @@
+"""Timing helpers of the ``bench_*.py`` modules.
+
+Each benchmark times a fast path against the implementation it replaced, on the
+same payloads, and fails if the fast path is not at least ``min_speedup`` times
+faster. They are not part of the default run (pytest collects ``test_*.py``),
+run them with ``python -m pytest -s tests/bench_*.py``.
+"""
+
+import timeit
+from collections.abc import Callable
+
+REPEAT = 5
+
+
+def best_time(func: Callable[[], object], number: int) -> float:
+    """Seconds per call, the best of a few runs."""
+    return min(timeit.repeat(func, number=number, repeat=REPEAT)) / number
+
+
+def compare(
+    name: str,
+    fast: Callable[[], object],
+    baseline: Callable[[], object],
+    number: int = 1000,
+    min_speedup: float = 1.0,
+) -> float:
+    """Times both callables and returns how many times faster ``fast`` is."""
+    fast_time = best_time(fast, number)
+    baseline_time = best_time(baseline, number)
+    speedup = baseline_time / fast_time
+    print(
+        f"{name}: {fast_time * 1e6:.2f} us, baseline {baseline_time * 1e6:.2f} us"
+        f" ({speedup:.1f}x)"
+    )
+    assert speedup >= min_speedup, f"{name} is only {speedup:.2f}x as fast"
+    return speedup
@@ -0,0 +1,136 @@
+import random
+
+import pytest
+
+from custom_components.ecoflow_cloud.devices.public.data_bridge import (
+    PlainFlattener,
+    status_to_plain,
+    to_plain,
+)
+
+_NAMES = ["a", "b", "a.b", "watts", "soc", "param", "params", "moduleSn", "time"]
+
+
+def _value(rnd: random.Random, depth: int):
+    kind = rnd.randrange(5 if depth < 2 else 3)
+    if kind == 0:
+        return rnd.randrange(1000)
+    if kind == 1:
+        return rnd.choice(["on", "off", ""])
+    if kind == 2:
+        return [rnd.randrange(10) for _ in range(rnd.randrange(3))]
+    return _section(rnd, depth + 1)
+
+
+def _section(rnd: random.Random, depth: int = 0) -> dict:
+    names = rnd.sample(_NAMES[:5], rnd.randrange(1, 5))
+    return {name: _value(rnd, depth) for name in names}
+
+
+def _payload(rnd: random.Random) -> dict:
+    raw: dict = {}
+    header = rnd.randrange(3)
+    if header == 0:
+        raw["typeCode"] = rnd.choice([*status_to_plain, "otherStatus"])
+    elif header == 1:
+        raw["cmdFunc"] = rnd.choice([20, 254])
+        raw["cmdId"] = rnd.choice([1, 21, 32])
+    # param and params share names on purpose, so do the top level keys
+    for section in ("param", "params"):
+        if rnd.random() < 0.7:
+            raw[section] = _section(rnd)
+    for name in rnd.sample(_NAMES, rnd.randrange(3)):
+        if name not in ("param", "params"):
+            raw[name] = _value(rnd, 0)
+    if rnd.random() < 0.3:
+        raw["sn"] = "R331ZEB4ZE000000"
+    return dict(rnd.sample(list(raw.items()), len(raw)))
+
+
+def _assert_same(actual: dict, expected: dict):
+    assert list(actual["params"].items()) == list(expected["params"].items())
+    assert {k: v for k, v in actual.items() if k != "params"} == {
+        k: v for k, v in expected.items() if k != "params"
+    }
+
+
+GOLDEN = [
+    {},
+    {"params": {"soc": 50}},
+    {"typeCode": "pdStatus", "params": {"watts": 10, "inv": {"on": 1}}},
+    {"typeCode": "newStatus", "param": {"x": 1}, "moduleSn": "M1", "time": 3},
+    {"cmdFunc": 254, "cmdId": 21, "params": {"a": {"b": 1}}, "sn": "S"},
+    # the same key in param and params, params wins
+    {"param": {"a": {"b": 1, "c": 2}}, "params": {"a": {"b": 3}}},
+    # a flat "a.b" next to a nested a.b, before and after it
+    {"params": {"a.b": 1, "a": {"b": 2}}},
+    {"params": {"a": {"b": 2}, "a.b": 1}},
+    {"params": {"a": {"b": 2}}, "a.b": 1},
+    # the payload key named like a section of it
+    {"typeCode": "pdStatus", "params": {"typeCode": "x"}},
+]
+
+# (payload, projected keys)
+GOLDEN_PROJECTED = [
+    ({"params": {"a": {"b": 1}}, "a.b": 2}, frozenset({"a.c"})),
+    ({"params": {"a": {"b": 1}, "c": 3}, "a.b": 2}, frozenset({"c"})),
+    ({"typeCode": "pdStatus", "params": {"a": {"b": 1}}}, frozenset({"pd.a.b"})),
+]
+
+
+@pytest.mark.parametrize("raw", GOLDEN)
+def test_golden_payloads(raw: dict):
+    _assert_same(PlainFlattener()(raw), to_plain(raw))
+
+
+@pytest.mark.parametrize(("raw", "keys"), GOLDEN_PROJECTED)
+def test_golden_projected_payloads(raw: dict, keys: frozenset[str]):
+    expected = to_plain(raw)["params"]
+    params = PlainFlattener()(raw, keys)["params"]
+    assert {k: expected[k] for k in params} == params
+    assert keys & expected.keys() <= params.keys()
+
+
+def test_random_payloads_match_to_plain():
+    rnd = random.Random(12)
+    flatten = PlainFlattener()
+    for _ in range(5000):
+        raw = _payload(rnd)
+        _assert_same(flatten(raw), to_plain(raw))
+
+
+def test_projected_keys_are_a_subset_of_to_plain():
+    rnd = random.Random(34)
+    flatten = PlainFlattener()
+    for _ in range(2000):
+        raw = _payload(rnd)
+        expected = to_plain(raw)["params"]
+        produced = list(expected)
+        keys = frozenset(
+            rnd.sample(produced, rnd.randrange(len(produced) + 1))
+            + ["pd.unrelated", "a.missing"]
+        )
+        params = flatten(raw, keys)["params"]
+        for key, value in params.items():
+            assert expected[key] == value, key
+        assert keys & expected.keys() <= params.keys()
+
+
+def test_prefixes_are_cached_per_type_code():
+    flatten = PlainFlattener()
+    first = flatten({"typeCode": "pdStatus", "params": {"a": 1}})
+    second = flatten({"typeCode": "pdStatus", "params": {"a": 2}})
+    assert first["params"] == {"pd.a": 1, "pd.typeCode": "pdStatus"}
+    assert second["params"] == {"pd.a": 2, "pd.typeCode": "pdStatus"}
+
+
+def test_devices_sharing_a_flattener_keep_their_projections():
+    flatten = PlainFlattener()
+    raw = {"cmdFunc": 2, "cmdId": 1, "params": {"watts": 1, "temp": 2}}
+    plug1 = frozenset({"2_1.watts"})
+    plug2 = frozenset({"2_1.temp"})
+    for _ in range(3):
+        assert flatten(raw, plug1)["params"] == {"2_1.watts": 1}
+        assert flatten(raw, plug2)["params"] == {"2_1.temp": 2}
+    # one cached entry per projection, none evicts the other
+    assert set(flatten._PlainFlattener__wanted) == {plug1, plug2}
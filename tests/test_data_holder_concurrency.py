@@ -0,0 +1,121 @@
+import asyncio
+import threading
+from typing import Any
+
+import pytest
+
+from custom_components.ecoflow_cloud.devices.data_holder import EcoflowDataHolder
+
+THREADS = 8
+MESSAGES = 2000
+
+
+class _LoopOnlyDict(dict):
+    """Params that fail the test when they are changed outside the loop thread."""
+
+    def __init__(self, loop_thread: int) -> None:
+        super().__init__()
+        self.loop_thread = loop_thread
+        self.foreign_writes = 0
+
+    def __check(self):
+        if threading.get_ident() != self.loop_thread:
+            self.foreign_writes += 1
+
+    def __setitem__(self, key: str, value: Any):
+        self.__check()
+        super().__setitem__(key, value)
+
+    def update(self, *args: Any, **kwargs: Any):
+        self.__check()
+        super().update(*args, **kwargs)
+
+
+async def _wait_for(condition, timeout: float = 10.0):
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+@pytest.mark.parametrize("coalesce_window", [0, 0.01])
+def test_concurrent_writers_are_applied_on_the_loop(coalesce_window: float):
+    async def run():
+        loop = asyncio.get_running_loop()
+        holder = EcoflowDataHolder(
+            lambda message: message,
+            collect_raw=False,
+            loop=loop,
+            coalesce_window=coalesce_window,
+        )
+        params = _LoopOnlyDict(threading.get_ident())
+        holder.params = params
+        start = threading.Barrier(THREADS)
+
+        def writer(index: int):
+            start.wait()
+            for n in range(MESSAGES):
+                holder.update_data(
+                    {"params": {f"thread{index}": n, "shared": (index, n)}}
+                )
+                if n % 100 == 0:
+                    holder.add_set_message({"id": f"{index}-{n}"})
+
+        threads = [
+            threading.Thread(target=writer, args=(i,)) for i in range(THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        # the loop keeps reading while the writers run
+        while any(thread.is_alive() for thread in threads):
+            assert all(isinstance(k, str) for k in list(holder.params))
+            await asyncio.sleep(0)
+        for thread in threads:
+            thread.join()
+
+        total = THREADS * MESSAGES
+        await _wait_for(lambda: holder.data_messages == total)
+        return holder, params, total
+
+    holder, params, total = asyncio.run(run())
+
+    assert params.foreign_writes == 0
+    for index in range(THREADS):
+        assert params[f"thread{index}"] == MESSAGES - 1
+    assert params["shared"][1] == MESSAGES - 1
+    # consecutive messages of a batch are merged once
+    assert 0 < holder.params_merges <= total
+    assert len(holder.set) == min(THREADS * MESSAGES // 100, 20)
+
+
+def test_calls_on_the_loop_are_applied_directly():
+    async def run():
+        holder = EcoflowDataHolder(
+            lambda message: message, loop=asyncio.get_running_loop()
+        )
+        holder.update_data({"params": {"a": 1}})
+        return holder.params.copy()
+
+    assert asyncio.run(run()) == {"a": 1}
+
+
+def test_changed_keys_cover_every_merge():
+    async def run():
+        holder = EcoflowDataHolder(
+            lambda message: message, loop=asyncio.get_running_loop()
+        )
+
+        def writer():
+            for n in range(500):
+                holder.update_data({"params": {f"k{n % 7}": n}})
+
+        threads = [threading.Thread(target=writer) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        await _wait_for(lambda: holder.data_messages == 2000)
+        return holder
+
+    holder = asyncio.run(run())
+    assert holder.take_changed_keys() == frozenset(f"k{n}" for n in range(7))
+    assert holder.take_changed_keys() == frozenset()
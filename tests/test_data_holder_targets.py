@@ -0,0 +1,33 @@
+from custom_components.ecoflow_cloud.devices.data_holder import EcoflowDataHolder
+
+
+def _holder() -> EcoflowDataHolder:
+    holder = EcoflowDataHolder(lambda message: message)
+    holder.update_data({"params": {"pd.watts": 1}})
+    holder.take_changed_keys()
+    return holder
+
+
+def test_target_for_a_known_key_marks_it_changed():
+    holder = _holder()
+    version = holder.version
+    woken = []
+    holder.target_listener = lambda: woken.append(True)
+    holder.update_to_target_state({"'pd.watts'": 5})
+    assert holder.params["pd.watts"] == 5
+    assert holder.version == version + 1
+    assert holder.take_changed_keys() == frozenset({"pd.watts"})
+    assert woken == [True]
+
+
+def test_target_that_cannot_be_applied_is_a_no_op():
+    holder = _holder()
+    version, params_time = holder.version, holder.params_time
+    woken = []
+    holder.target_listener = lambda: woken.append(True)
+    holder.update_to_target_state({"'pd.unknown'": 5})
+    assert holder.params == {"pd.watts": 1}
+    assert holder.version == version
+    assert holder.params_time == params_time
+    assert holder.take_changed_keys() == frozenset()
+    assert woken == []
@@ -0,0 +1,85 @@
+import asyncio
+import datetime
+
+import pytest
+from homeassistant.components import recorder
+from homeassistant.components.recorder import statistics
+from homeassistant.util import dt
+
+from custom_components.ecoflow_cloud.energy_statistics import EcoflowEnergyStatistics
+
+DAY_START = datetime.datetime(2024, 5, 10, tzinfo=datetime.UTC)
+HOUR = datetime.timedelta(hours=1)
+WATTH = [10] * 24
+STATISTIC_ID = "ecoflow_cloud:hw51_energy"
+
+
+class _Recorder:
+    async def async_add_executor_job(self, target, *args):
+        return target(*args)
+
+
+@pytest.fixture
+def last_row(monkeypatch):
+    monkeypatch.setattr(dt, "DEFAULT_TIME_ZONE", datetime.UTC)
+    monkeypatch.setattr(recorder, "get_instance", lambda hass: _Recorder())
+    row: dict = {}
+    monkeypatch.setattr(
+        statistics,
+        "get_last_statistics",
+        lambda hass, count, statistic_id, convert, types: (
+            {statistic_id: [row]} if row else {}
+        ),
+    )
+    # the hourly rows before the day, the last one has a sum of 500
+    monkeypatch.setattr(
+        statistics,
+        "statistics_during_period",
+        lambda hass, start, end, ids, period, units, types: {
+            STATISTIC_ID: [{"sum": 400.0}, {"sum": 500.0}]
+        },
+    )
+    return row
+
+
+def _baseline(
+    row: dict,
+    start: datetime.datetime,
+    state: float,
+    total: float,
+    watth: list[int] = WATTH,
+):
+    row.update(start=start.timestamp(), state=state, sum=total)
+    energy = EcoflowEnergyStatistics(None, "HW51", "PowerStream")
+    return asyncio.run(
+        energy._EcoflowEnergyStatistics__async_baseline(
+            "energy", STATISTIC_ID, DAY_START, watth
+        )
+    )
+
+
+def test_first_import(last_row):
+    energy = EcoflowEnergyStatistics(None, "HW51", "PowerStream")
+    baseline = energy._EcoflowEnergyStatistics__async_baseline(
+        "energy", STATISTIC_ID, DAY_START, WATTH
+    )
+    assert asyncio.run(baseline) == 0.0
+
+
+def test_row_of_a_previous_day(last_row):
+    assert _baseline(last_row, DAY_START - HOUR, 10, 500) == 500
+
+
+def test_restart_during_the_day(last_row):
+    # hours 0 to 3 were imported, the sum before the day was 500
+    assert _baseline(last_row, DAY_START + 3 * HOUR, 10, 540) == 500
+
+
+def test_row_of_a_later_day_is_ignored(last_row):
+    # e.g. imported while the clock was a day ahead
+    assert _baseline(last_row, DAY_START + 30 * HOUR, 10, 900) == 500
+
+
+def test_hours_past_the_report_are_clamped(last_row):
+    # a report with 12 hours only, the row is from hour 20
+    assert _baseline(last_row, DAY_START + 20 * HOUR, 10, 630, [10] * 12) == 500
@@ -0,0 +1,142 @@
+import random
+
+import pytest
+
+pytest.importorskip("google.protobuf")
+
+from google.protobuf.descriptor import FieldDescriptor  # noqa: E402
+from google.protobuf.json_format import MessageToDict  # noqa: E402
+
+from custom_components.ecoflow_cloud.devices.internal.proto import (  # noqa: E402
+    platform_pb2,
+    powerstream_pb2,
+)
+from custom_components.ecoflow_cloud.devices.internal.proto.support.const import (  # noqa: E402
+    Command,
+    get_expected_payload_type,
+)
+from custom_components.ecoflow_cloud.devices.internal.proto.support.extractor import (  # noqa: E402
+    ProtoExtractor,
+    _is_repeated,
+    command_extractor,
+)
+
+_INTEGERS = {
+    FieldDescriptor.CPPTYPE_INT32: (-(2**31), 2**31 - 1),
+    FieldDescriptor.CPPTYPE_UINT32: (0, 2**32 - 1),
+    FieldDescriptor.CPPTYPE_INT64: (-(2**63), 2**63 - 1),
+    FieldDescriptor.CPPTYPE_UINT64: (0, 2**64 - 1),
+}
+
+
+def _scalar(rnd: random.Random, field: FieldDescriptor):
+    cpp_type = field.cpp_type
+    if cpp_type in _INTEGERS:
+        low, high = _INTEGERS[cpp_type]
+        # defaults, small values and the extremes
+        return rnd.choice([0, 1, low, high, rnd.randint(low, high)])
+    if cpp_type == FieldDescriptor.CPPTYPE_BOOL:
+        return rnd.random() < 0.5
+    if cpp_type in (FieldDescriptor.CPPTYPE_FLOAT, FieldDescriptor.CPPTYPE_DOUBLE):
+        return rnd.choice([0.0, 0.5, -3.25, float(rnd.randrange(1000))])
+    if cpp_type == FieldDescriptor.CPPTYPE_ENUM:
+        return rnd.choice(field.enum_type.values).number
+    if field.type == FieldDescriptor.TYPE_BYTES:
+        return rnd.randbytes(rnd.randrange(4))
+    return rnd.choice(["", "a", "ÄÖ", str(rnd.randrange(1000))])
+
+
+def _fill(rnd: random.Random, message, depth: int = 0):
+    for field in message.DESCRIPTOR.fields:
+        if rnd.random() < 0.3:
+            continue
+        repeated = _is_repeated(field)
+        if field.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE:
+            if depth > 2:
+                continue
+            if repeated:
+                for _ in range(rnd.randrange(3)):
+                    _fill(rnd, getattr(message, field.name).add(), depth + 1)
+            else:
+                _fill(rnd, getattr(message, field.name), depth + 1)
+                # an empty nested message is still set
+                getattr(message, field.name).SetInParent()
+        elif repeated:
+            getattr(message, field.name).extend(
+                _scalar(rnd, field) for _ in range(rnd.randrange(3))
+            )
+        else:
+            setattr(message, field.name, _scalar(rnd, field))
+
+
+def _message_types(module) -> list:
+    return [
+        module._sym_db.GetSymbol(descriptor.full_name)
+        for descriptor in module.DESCRIPTOR.message_types_by_name.values()
+    ]
+
+
+MESSAGE_TYPES = _message_types(powerstream_pb2) + [
+    get_expected_payload_type(command) for command in Command
+]
+
+
+@pytest.mark.parametrize(
+    "message_type", dict.fromkeys(MESSAGE_TYPES), ids=lambda t: t.DESCRIPTOR.name
+)
+def test_extract_matches_message_to_dict(message_type):
+    rnd = random.Random(message_type.DESCRIPTOR.full_name)
+    extractor = ProtoExtractor(message_type, "20_1.")
+    for _ in range(200):
+        message = message_type()
+        _fill(rnd, message)
+        pdata = message.SerializeToString()
+
+        params = {}
+        extractor.extract(pdata, params)
+        expected = {
+            f"20_1.{k}": v
+            for k, v in MessageToDict(
+                message_type.FromString(pdata), preserving_proto_field_name=False
+            ).items()
+        }
+        assert params == expected
+        # same types too, e.g. no int where MessageToDict has a string
+        assert {k: type(v) for k, v in params.items()} == {
+            k: type(v) for k, v in expected.items()
+        }
+
+
+@pytest.mark.parametrize(
+    "message_type", dict.fromkeys(MESSAGE_TYPES), ids=lambda t: t.DESCRIPTOR.name
+)
+def test_projection_is_a_subset(message_type):
+    rnd = random.Random(message_type.DESCRIPTOR.name)
+    extractor = ProtoExtractor(message_type, "")
+    for _ in range(50):
+        message = message_type()
+        _fill(rnd, message)
+        pdata = message.SerializeToString()
+        full = {}
+        extractor.extract(pdata, full)
+        projection = frozenset(rnd.sample(list(full), rnd.randrange(len(full) + 1)))
+        params = {}
+        extractor.extract(pdata, params, projection)
+        assert projection <= params.keys()
+        assert {k: full[k] for k in params} == params
+
+
+@pytest.mark.parametrize("command", list(Command), ids=lambda c: c.name)
+def test_command_extractor_prefix(command: Command):
+    message_type = get_expected_payload_type(command)
+    message = message_type()
+    _fill(random.Random(command.name), message)
+    params = {}
+    command_extractor(command).extract(message.SerializeToString(), params)
+    prefix = f"{command.func}_{command.id}."
+    assert all(key.startswith(prefix) for key in params)
+    assert command_extractor(command) is command_extractor(command)
+
+
+def test_platform_types_are_covered():
+    assert platform_pb2.BatchEnergyTotalReport in MESSAGE_TYPES
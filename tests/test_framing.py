@@ -0,0 +1,124 @@
+import random
+
+import pytest
+
+from custom_components.ecoflow_cloud.devices.internal.proto.support.framing import (
+    split_frames,
+)
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _field(number: int, data: bytes) -> bytes:
+    return _varint(number << 3 | 2) + _varint(len(data)) + data
+
+
+def _other_field(rnd: random.Random) -> bytes:
+    kind = rnd.randrange(4)
+    if kind == 0:
+        return _varint(2 << 3) + _varint(rnd.randrange(1 << 40))
+    if kind == 1:
+        return _varint(3 << 3 | 1) + rnd.randbytes(8)
+    if kind == 2:
+        return _varint(4 << 3 | 5) + rnd.randbytes(4)
+    return _field(5, rnd.randbytes(rnd.randrange(20)))
+
+
+def _corpus(rnd: random.Random) -> tuple[bytes, list[tuple[bytes, int]]]:
+    """A serialized header message and its frames with the offset they end at."""
+    buffer = bytearray()
+    frames = list[tuple[bytes, int]]()
+    for _ in range(rnd.randrange(6)):
+        if rnd.random() < 0.3:
+            buffer += _other_field(rnd)
+        else:
+            # zero-length, small and frames with a multi byte length
+            size = rnd.choice([0, 0, rnd.randrange(1, 20), rnd.randrange(128, 400)])
+            frame = rnd.randbytes(size)
+            buffer += _field(1, frame)
+            frames.append((frame, len(buffer)))
+    return bytes(buffer), frames
+
+
+def _split(data) -> list[bytes]:
+    return [bytes(frame) for frame in split_frames(data)]
+
+
+@pytest.mark.parametrize(
+    ("data", "expected"),
+    [
+        (b"", []),
+        (_field(1, b""), [b""]),
+        (_field(1, b"") * 3, [b"", b"", b""]),
+        (_field(1, b"ab") + _field(1, b"") + _field(1, b"c"), [b"ab", b"", b"c"]),
+        (_field(2, b"ab") + _field(1, b"c"), [b"c"]),
+        (_field(1, b"abc")[:-1], []),
+        (_field(1, b"a") + b"\x0a", [b"a"]),
+        (_field(1, b"a") + b"\x0a\x80", [b"a"]),
+        (_field(1, b"a") + b"\x0b\x00" + _field(1, b"b"), [b"a"]),
+        (b"\xff" * 11, []),
+    ],
+)
+def test_split_frames(data: bytes, expected: list[bytes]):
+    assert _split(data) == expected
+
+
+def test_frames_are_views_on_the_buffer():
+    data = bytearray(_field(1, b"abc"))
+    (frame,) = split_frames(data)
+    data[2] = ord("x")
+    assert bytes(frame) == b"xbc"
+
+
+def test_concatenated_messages():
+    rnd = random.Random(1)
+    for _ in range(500):
+        parts = [_corpus(rnd) for _ in range(rnd.randrange(1, 4))]
+        data = b"".join(data for data, _ in parts)
+        expected = [frame for _, frames in parts for frame, _ in frames]
+        assert _split(data) == expected
+        assert _split(memoryview(data)) == expected
+
+
+def test_truncated_at_every_offset():
+    rnd = random.Random(2)
+    for _ in range(200):
+        data, frames = _corpus(rnd)
+        for cut in range(len(data) + 1):
+            expected = [frame for frame, end in frames if end <= cut]
+            assert _split(data[:cut]) == expected, (data, cut)
+
+
+def test_garbage_terminates():
+    rnd = random.Random(3)
+    for _ in range(5000):
+        data = rnd.randbytes(rnd.randrange(64))
+        frames = _split(data)
+        assert sum(len(frame) for frame in frames) <= len(data)
+
+
+def test_matches_protobuf():
+    pytest.importorskip("google.protobuf")
+    from custom_components.ecoflow_cloud.devices.internal.proto import ecopacket_pb2
+
+    rnd = random.Random(4)
+    for _ in range(200):
+        packet = ecopacket_pb2.SendHeaderMsg()
+        for _ in range(rnd.randrange(5)):
+            header = packet.msg.add()
+            if rnd.random() < 0.8:
+                header.pdata = rnd.randbytes(rnd.randrange(300))
+                header.cmd_func = rnd.randrange(255)
+                header.cmd_id = rnd.randrange(255)
+        data = packet.SerializeToString()
+        assert _split(data) == [h.SerializeToString() for h in packet.msg]
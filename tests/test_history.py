@@ -0,0 +1,55 @@
+import datetime
+
+from custom_components.ecoflow_cloud.devices import history
+from custom_components.ecoflow_cloud.devices.history import (
+    COMPRESS_KEEP_NEWEST,
+    EcoflowHistory,
+    EcoflowHistoryBudget,
+)
+
+
+def _quota(n: int) -> dict:
+    return {"params": {f"pd.value{i}": i * 0.5 for i in range(300)}, "id": n}
+
+
+def test_newest_entries_are_not_serialized(monkeypatch):
+    encoded = []
+    encode = history._encode
+    monkeypatch.setattr(
+        history, "_encode", lambda value: encoded.append(value) or encode(value)
+    )
+    entries = EcoflowHistory()
+    for n in range(5):
+        entries.append(_quota(n))
+    # only the entries that left the newest ones were measured
+    assert [value["id"] for value in encoded] == [0, 1, 2]
+    assert entries.stats()["compressed"] == 5 - COMPRESS_KEEP_NEWEST
+
+
+def test_iterates_newest_first_through_compression():
+    entries = EcoflowHistory()
+    values = [_quota(n) for n in range(6)]
+    for value in values:
+        entries.append(value)
+    assert list(entries) == values[::-1]
+
+
+def test_budget_matches_the_entries():
+    budget = EcoflowHistoryBudget(40_000)
+    first = EcoflowHistory(budget)
+    second = EcoflowHistory(budget, compress=False)
+    for n in range(30):
+        first.append(_quota(n))
+        second.append({"id": n, "text": "x" * 500})
+        assert budget.used == first.used + second.used
+        assert budget.used <= budget.max_bytes or len(first) == len(second) == 1
+    assert first.evicted + second.evicted > 0
+
+
+def test_compressed_values_come_back_as_json():
+    entries = EcoflowHistory()
+    when = datetime.datetime(2024, 1, 2, 3, 4, 5)
+    entries.append({"time": when, "data": "x" * 2000})
+    for n in range(COMPRESS_KEEP_NEWEST):
+        entries.append({"id": n})
+    assert list(entries)[-1] == {"time": str(when), "data": "x" * 2000}
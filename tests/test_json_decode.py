@@ -0,0 +1,50 @@
+import json
+import math
+
+import pytest
+
+from custom_components.ecoflow_cloud.devices import json_decode
+from custom_components.ecoflow_cloud.devices.json_decode import decode_json
+
+
+def _baseline(raw_data: bytes):
+    """The decoding of BaseDevice._prepare_data before decode_json."""
+    try:
+        return json.loads(raw_data.decode("utf-8", errors="ignore"))
+    except Exception:
+        return {}
+
+
+PAYLOADS = [
+    b'{"params": {"soc": 50}}',
+    b'{"params": {"name": "caf\xc3\xa9"}}',
+    b'{"params": {"name": "caf\xe9"}}',
+    b'{"params": {"a": NaN, "b": Infinity, "c": -Infinity}}',
+    b'{"params": {"a": NaN, "name": "\xff"}}',
+    b'{"params": ',
+    b"",
+    b"garbage",
+]
+
+
+@pytest.mark.parametrize("raw", PAYLOADS)
+def test_lenient_decode_matches_the_baseline(raw: bytes):
+    decoded = decode_json(raw, "test")
+    expected = _baseline(raw)
+    # NaN != NaN, compare the JSON text
+    assert json.dumps(decoded, sort_keys=True) == json.dumps(expected, sort_keys=True)
+
+
+def test_strict_decode_rejects_invalid_utf8():
+    assert decode_json(b'{"name": "caf\xe9"}', "test", strict=True) == {}
+    assert math.isnan(decode_json(b'{"a": NaN}', "test", strict=True)["a"])
+
+
+def test_syntax_errors_are_not_retried(monkeypatch):
+    retries = []
+    monkeypatch.setattr(
+        json_decode.json, "loads", lambda data: retries.append(data) or {}
+    )
+    assert decode_json(b'{"params": ', "test") == {}
+    assert decode_json(b'{"a": 1} trailing', "test") == {}
+    assert retries == []
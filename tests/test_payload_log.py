@@ -0,0 +1,33 @@
+import logging
+
+from custom_components.ecoflow_cloud.payload_log import LazyHex, RateLimitedLog
+
+
+def test_suppressed_count_only_when_messages_were_suppressed(caplog):
+    logger = logging.getLogger("test_payload_log")
+    log = RateLimitedLog(logger, interval=0)
+    with caplog.at_level(logging.ERROR, logger.name):
+        log.error("sn", "Failed on %s", "a")
+        log.error("sn", "Failed on %s", "b")
+    assert [r.getMessage() for r in caplog.records] == ["Failed on a", "Failed on b"]
+
+
+def test_suppressed_messages_are_counted(caplog):
+    logger = logging.getLogger("test_payload_log")
+    log = RateLimitedLog(logger, interval=3600)
+    with caplog.at_level(logging.ERROR, logger.name):
+        for n in range(4):
+            log.error("sn", "Failed %d", n)
+        log.error("other", "Failed %d", 9)
+    assert [r.getMessage() for r in caplog.records] == ["Failed 0", "Failed 9"]
+    log._RateLimitedLog__state[("sn", "Failed %d")] = (0.0, 3)
+    with caplog.at_level(logging.ERROR, logger.name):
+        log.error("sn", "Failed %d", 5)
+    assert caplog.records[-1].getMessage() == (
+        "Failed 5 (3 similar messages suppressed)"
+    )
+
+
+def test_lazy_hex_truncates():
+    assert str(LazyHex(b"\x01\x02\x03", limit=2)) == "0102... (3 bytes)"
+    assert str(LazyHex("abc", limit=5)) == "abc"
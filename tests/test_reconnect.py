@@ -0,0 +1,41 @@
+import threading
+
+from custom_components.ecoflow_cloud.api.reconnect import EcoflowReconnectManager
+
+
+def test_failed_attempts_are_retried_until_one_succeeds():
+    results = [False, False, True]
+    calls = []
+    done = threading.Event()
+
+    def reconnect() -> bool:
+        calls.append(True)
+        if len(calls) == len(results):
+            done.set()
+        return results[len(calls) - 1]
+
+    manager = EcoflowReconnectManager(reconnect, base_delay=0.001)
+    assert manager.request()
+    assert done.wait(5)
+    manager.stop()
+    stats = manager.stats()
+    assert stats["attempts"] == 3
+    assert stats["failures"] == 2
+
+
+def test_requests_in_flight_are_coalesced():
+    manager = EcoflowReconnectManager(lambda: True, base_delay=10)
+    assert manager.request()
+    assert not manager.request()
+    manager.stop()
+    assert manager.stats()["coalesced_requests"] == 1
+
+
+def test_dropped_connections_count_as_storms():
+    manager = EcoflowReconnectManager(lambda: True, base_delay=10, storm_threshold=3)
+    for _ in range(3):
+        # what the MQTT client does when paho reports a dropped connection
+        manager.on_disconnected()
+        manager.request()
+    manager.stop()
+    assert manager.stats()["storms"] == 1